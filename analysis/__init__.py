@@ -1,3 +1,4 @@
+import os
 import random
 
 from logger import logger
@@ -5,13 +6,13 @@ from robot.component import IRSensor
 from robot.component.motor import Motor
 from functools import reduce
 from nanowire_network_simulator.model.device import Datasheet
-from nanowire_network_simulator import stimulate
-from robot.cortex import new as new_cortex, Cortex
+from optimization.cache import cached
+from robot.cortex import Cortex, stimulate, voltage
 from robot.fiber import nodes
 from robot.pyramid import random as random_pyramid, Pyramid
 from robot.thalamus import random as random_thalamus, Thalamus
 from typing import Iterable, Dict, Tuple
-from utils import adapt
+from utils import adapt, mapper
 
 default_datasheet: Datasheet = Datasheet(
     wires_count=100,
@@ -21,6 +22,9 @@ default_datasheet: Datasheet = Datasheet(
 sensor_range = IRSensor.range(IRSensor())
 motors_range = Motor.range(reverse=False)
 
+# folder of the generated devices, reused by the analyses (and between them)
+devices_cache = os.path.join(os.path.dirname(__file__), 'cache')
+
 
 def collapse_history(data: Iterable):
     """
@@ -34,16 +38,18 @@ def collapse_history(data: Iterable):
 def generate(
         data: Datasheet = default_datasheet,
         load: float = 0.0,
-        seed: int = None
+        seed: int = None,
+        sparse: bool = False
 ) -> Tuple[Cortex, Pyramid, Thalamus]:
     """
     Generate a device, a conductor and a set of connections to instantiate and
-    perform experiments in a shorter and cleaner way.
+    perform experiments in a shorter and cleaner way. The device is reused from
+    the cache folder, if already generated.
     """
     if seed:
         random.seed(seed)
 
-    cortex = new_cortex(data)
+    cortex = cached(devices_cache)(data, sparse)
 
     class EPuck:
         pass
@@ -65,16 +71,17 @@ def evaluate(
         i_range: Tuple[float, float] = sensor_range,
         o_range: Tuple[float, float] = motors_range
 ) -> Dict[str, float]:
-    graph, working_range = cortex.network, cortex.working_range
+    to_network = mapper(tuple(i_range), cortex.working_range)
+    from_network = mapper(cortex.working_range, tuple(o_range))
 
     read = {thalamus.mapping[s]: v for s, v in stimulus.items()}
-    read = [(k, adapt(v, i_range, working_range)) for k, v in read.items()]
+    read = [(k, to_network(v)) for k, v in read.items()]
     load = [(pin, pyramid.sensitivity) for pin in nodes(pyramid.mapping)]
 
-    stimulate(graph, cortex.datasheet, time, read, load, set())
+    stimulate(cortex, time, read, load)
 
-    outs = [(m, graph.nodes[p]['V']) for m, p in pyramid.mapping.items()]
-    return {k: adapt(v, working_range, o_range) for k, v in outs}
+    outs = [(m, voltage(cortex, p)) for m, p in pyramid.mapping.items()]
+    return {k: from_network(v) for k, v in outs}
 
 
 logger.propagate = False
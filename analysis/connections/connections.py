@@ -5,6 +5,7 @@ import scipy.stats as stats
 
 from robot.cortex import Cortex
 from nanowire_network_simulator import backup, stimulate, Evolution, plot
+from optimization import archive
 from os import listdir
 from os.path import join, isfile
 from scipy.signal import savgol_filter
@@ -36,21 +37,7 @@ MOTOR_RANGE = (6.28, -6.28) if PROXIMITY_MEASURE else (-6.28, 6.28)
 # proper, high-level, mediation/mixing mechanisms.
 
 # import configurations
-files = filter(isfile, map(lambda s: join(DIRECTORY, s), listdir(DIRECTORY)))
-files = list(filter(lambda _: _.endswith('.dat'), files))
-files = sorted(files, key=lambda _: _.split('.')[-2])
-chunks = [*map(lambda i: sorted(files[i * 6:][:6]), range(int(len(files) / 6)))]
-io_signals = [(chunk[4], chunk[3]) for chunk in chunks]
-others = [chunk[:3] + chunk[-1:] for chunk in chunks]
-others = list(map(lambda _: backup.read(_[1], _[2], _[3], _[0]), others))
-
-# analyse just one device
-io_signals = io_signals[CONFIGURATION_INDEX]
-graph, datasheet, wires, connections = others[CONFIGURATION_INDEX]
-sensors = connections['inputs']
-actuators = connections['outputs']
-multipliers = connections['multiplier']
-sensitivity = connections['load']
+entries = archive.entries(DIRECTORY)
 
 
 def file_import(name):
@@ -58,8 +45,38 @@ def file_import(name):
         return json.loads(file.read())
 
 
-# get sensors readings and motors outputs
-i_signals, o_signals = [file_import(file) for file in io_signals]
+def steps(signals):
+    """Expand collapsed signals to the form [state, state, ...]."""
+    return [dict(zip(signals, _)) for _ in zip(*signals.values())]
+
+
+# analyse just one device, reading its archive from the manifest; the old runs
+# saved instead six files per device, with the signals histories as json
+if entries:
+    path = join(DIRECTORY, entries[CONFIGURATION_INDEX]['archive'])
+    graph, datasheet, wires, connections = archive.read(path)
+
+    # get sensors readings and motors outputs (memory-mapped)
+    i_signals = archive.signals(path, 'stimulus')
+    o_signals = archive.signals(path, 'response')
+else:
+    files = map(lambda s: join(DIRECTORY, s), listdir(DIRECTORY))
+    files = list(filter(lambda _: isfile(_) and _.endswith('.dat'), files))
+    files = sorted(files, key=lambda _: _.split('.')[-2])
+    chunks = [*map(lambda i: sorted(files[i * 6:][:6]), range(len(files) // 6))]
+    chunk = chunks[CONFIGURATION_INDEX]
+    graph, datasheet, wires, connections = backup.read(
+        chunk[1], chunk[2], chunk[5], chunk[0]
+    )
+
+    # get sensors readings and motors outputs
+    i_signals, o_signals = map(file_import, (chunk[4], chunk[3]))
+    i_signals, o_signals = map(collapse_history, (i_signals, o_signals))
+
+sensors = connections['inputs']
+actuators = connections['outputs']
+multipliers = connections['multiplier']
+sensitivity = connections['load']
 
 fig = plt.figure(figsize=(12, 8))
 figs = iter(fig.subfigures(3, 1))
@@ -72,7 +89,7 @@ def smoother(signal):
 
 # plot distances
 ax = next(figs).subplots()
-for key, signals in collapse_history(i_signals).items():
+for key, signals in i_signals.items():
     if not PROXIMITY_MEASURE:
         signals = [s if s < 5 else 5 for s in signals]
     ax.plot(signals, label=key)
@@ -87,7 +104,7 @@ ax.legend()
 # plot direction
 ax = next(figs).subplots()
 
-left_signals, right_signals = collapse_history(o_signals).values()
+left_signals, right_signals = o_signals.values()
 direction = [left - right for left, right in zip(left_signals, right_signals)]
 direction = smoother(direction)
 ax.plot(direction)
@@ -98,7 +115,7 @@ ax.set_yticks(range(-6, 7), ['left', *map(str, range(-10, 11, 2)), 'right'])
 # plot motors control signal
 axs = iter(next(figs).subplots(1, 2))
 
-for key, command in collapse_history(o_signals).items():
+for key, command in o_signals.items():
     # approximate signal with a curve; window size 51, polynomial order 3
     command_smooth = smoother(command)
     ax = next(axs)
@@ -131,11 +148,11 @@ plt.show()
 
 _, ax = plt.subplots()
 
-ps = collapse_history(i_signals)[SENSOR]
+ps = i_signals[SENSOR]
 if not PROXIMITY_MEASURE:
     ps = [s if s < 5 else 5 for s in ps]
-left = collapse_history(o_signals)['left wheel motor']
-right = collapse_history(o_signals)['right wheel motor']
+left = o_signals['left wheel motor']
+right = o_signals['right wheel motor']
 
 pairs = sorted(zip(ps, left, right))
 if not PROXIMITY_MEASURE:
@@ -180,9 +197,9 @@ fig, ax = plt.subplots()
 correlations = {
     mk: [
         stats.pearsonr(sv, mv)[0]
-        for sk, sv in collapse_history(i_signals).items()
+        for sk, sv in i_signals.items()
     ]
-    for mk, mv in collapse_history(o_signals).items()
+    for mk, mv in o_signals.items()
 }
 pcm = ax.pcolormesh(
     correlations.keys(),
@@ -247,7 +264,7 @@ def break_sensor(name: str):
         )
 
     commands = []
-    for stimulus in i_signals:
+    for stimulus in steps(i_signals):
         stimulus = {k: v for k, v in stimulus.items() if k != name}
         commands += [
             evaluate(
@@ -372,7 +389,7 @@ for _ in range(100):
     stimulate(graph, datasheet, 1e3, [], [], set())
 
 resistances = []
-for i_signal in i_signals:
+for i_signal in steps(i_signals):
     evaluate(cortex, pyramid, thalamus, i_signal, 0.1, IR_RANGE, MOTOR_RANGE)
     resistances += [{
         motor_name: {
@@ -1,10 +1,60 @@
+import json
 import matplotlib.patches as ptc
 import matplotlib.pyplot as plt
+import os
 
 from collections import defaultdict
 from functools import reduce
 from itertools import product
-from typing import Dict, List, Any, Callable
+from typing import Dict, List, Any, Callable, Tuple
+
+# metrics stream of a run (see 'optimization.metrics') and its legacy dataset
+METRICS = 'metrics.jsonl'
+DATASET = 'dataset.json'
+
+
+def records(path: str, position: int = 0) -> Tuple[List[Dict], int]:
+    """
+    Read the records of a metrics stream from the given position (in bytes) and
+    return them with the position to continue from. Just complete lines are
+    read, so that a stream can be followed while the run writes it.
+    """
+    with open(path, 'rb') as file:
+        file.seek(position)
+        lines = file.readlines()
+    if lines and not lines[-1].endswith(b'\n'):
+        lines.pop()
+    return [json.loads(_) for _ in lines], position + sum(map(len, lines))
+
+
+def dataset(folder: str) -> List[Dict]:
+    """
+    Load the dataset of a run: a configuration per simulation, with its device
+    properties, its sensors multipliers and the fitness of each epoch. It is
+    built from the metrics stream of the run, if present, otherwise it is the
+    dataset converted from its readme (see 'tools/readme2json.py').
+    """
+    if not os.path.isfile(os.path.join(folder, METRICS)):
+        with open(os.path.join(folder, DATASET)) as file:
+            return json.load(file)
+
+    # a resumed simulation may record an epoch again: the last record is kept
+    epochs = defaultdict(dict)
+    for record in records(os.path.join(folder, METRICS))[0]:
+        epochs[record['configuration']][record['epoch']] = record
+
+    def configuration(data: Dict[int, Dict]) -> Dict:
+        first = data[min(data)]
+        multipliers = first['multiplier'].values()
+        return dict(
+            density=first['density'],
+            cc_density=first['cc_density'],
+            load=first['load'],
+            avg_multiplier=sum(multipliers) / len(multipliers) * 100,
+            multiplier=first['multiplier'],
+            fitness=[data[_]['fitness'] for _ in sorted(data)]
+        )
+    return [configuration(epochs[_]) for _ in sorted(epochs)]
 
 
 def formats(v) -> str: return ('{v:.2f}' if v < 1000 else '{v:.0e}').format(v=v)
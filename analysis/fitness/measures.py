@@ -5,8 +5,7 @@ from fitness import *
 from scipy.signal import savgol_filter
 
 
-with open(sys.argv[1] + 'dataset.json') as file:
-    data = json.load(file)
+data = dataset(sys.argv[1])
 
 if 'area' in sys.argv[1]:
     limits = [75, 90]
@@ -119,7 +118,10 @@ plt.show()
 if 'tmaze' not in sys.argv[1]:
     exit()
 
+# the datasets of the old runs miss the multipliers: they are in their files
 for i, d in enumerate(data):
+    if 'multiplier' in d:
+        continue
     with open(f'{sys.argv[1]}/connections.{i}.dat') as file:
         file_data = json.load(file)
         d['multiplier'] = file_data.get('multiplier', 1.0)
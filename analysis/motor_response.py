@@ -1,6 +1,7 @@
 import matplotlib.patches as ptc
 import matplotlib.pyplot as plt
 import matplotlib.ticker as tkr
+import numpy as np
 
 from analysis import *
 from nanowire_network_simulator import plot, Evolution
@@ -81,7 +82,7 @@ def stimulation_values(
     }
 
     # make data
-    x: List[float] = [adapt(s, sensor_range, (0, 10)) for s in io.keys()]
+    x: List[float] = adapt(np.array([*io]), sensor_range, (0, 10)).tolist()
     y: List[Dict[str, float]] = [*io.values()]
 
     return x, y, e
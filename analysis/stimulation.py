@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
 
 from analysis import *
 from nanowire_network_simulator import Evolution
@@ -30,7 +31,7 @@ for ax, frequency in zip(axs, [0.1, 2, 10]):
         ax.set_xlabel('time (s)')
         ax.set_ylabel('Input Voltage (V)', color='tab:red')
         ax.tick_params(axis='y', labelcolor='tab:red')
-        line += ax.plot([adapt(_, sensor_range, (0, 10)) for _ in s], color='r')
+        line += ax.plot(adapt(np.array(s), sensor_range, (0, 10)), color='r')
 
         ax1 = ax.twinx()
 
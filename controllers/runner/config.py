@@ -29,8 +29,14 @@ from datetime import datetime
 from itertools import product
 from logger import logger, Settings, setup
 from nanowire_network_simulator import LOGGER_NAME as NNS_LOGGER_NAME
+from optimization.shard import parse as parse_shard
+from optimization.strategy import Strategy
 from optimization.task import Tasks, Task
+from profiler import profiler, setup as setup_profiler
 from robot.body import EPuck
+from robot.surrogate import Surrogate
+from typing import Optional
+from world.arena import load as arena
 
 ################################################################################
 # SIMULATION CONFIGURATIONS
@@ -61,11 +67,31 @@ densities = sorted(list(map(lambda _: _ * 2.5 + 5.0, range(3))) * replica_count)
 # motor loads to test [1e3, 1e4, 1e5, 1e6]
 loads = list(map(lambda exp: 10 ** exp, range(3, 7)))
 
+# back the devices with their sparse (array based) representation, instead of
+# the simulator one (their parity is checked by 'test/runner/robot/cortex.py')
+sparse_cortex = False
+
 # create the configurations and add a unique seed for each
 settings = [(*_, random.randint(0, 9999)) for _ in product(densities, loads)]
 
+# world file reproduced by a (faster) surrogate body to pre-screen the evolved
+# individuals, e.g. '../../worlds/main_world.wbt'. If None, all the individuals
+# are evaluated in webots
+screening_world: Optional[str] = None
+surrogate = screening_world and Surrogate(task.sensors, arena(screening_world))
+
+# strategy searching the best individual of each simulation, as the ones of the
+# 'optimization.strategy' module (e.g., plus(2, 4) or cma(evaluate=batch), the
+# latter requiring the screening world). If None, the (1+1) elitist strategy is
+# used
+strategy: Optional[Strategy] = None
+
 # define a tuple that contains the information used to simulate
-simulation_settings = task, epoch_count, epoch_duration
+simulation_settings = task, epoch_count, epoch_duration, surrogate, strategy
+
+# part of the configurations run by this process, when they are distributed
+# between more processes (format 'index/count', e.g. '2/8')
+shard = parse_shard(os.environ.get('RUNNER_SHARD', '0/1'))
 
 # create the Robot instance
 robot = EPuck(sensors=task.sensors)
@@ -73,16 +99,42 @@ robot = EPuck(sensors=task.sensors)
 ################################################################################
 # DATA SAVE SETUP
 
-# create the folder for saving the simulation files
+# create the folder for saving the simulation files. The processes running the
+# shards of the same campaign share it, writing a log file each. A given folder
+# can already exist, when the process is restarted after a crash
 CONFIGURATIONS_LOCATION = '../../res/configuration'
-SAVING_FOLDER = datetime.today().strftime('%Y-%m-%d.%H%M%S%f')
-os.mkdir(save_path := os.path.join(CONFIGURATIONS_LOCATION, SAVING_FOLDER))
-
-setup(logger, Settings(path=save_path + '/', plot_mode=Settings.Mode.NONE))
-setup(logging.getLogger(NNS_LOGGER_NAME), Settings(path=save_path + '/'))
+SAVING_FOLDER = os.environ.get('RUNNER_SAVE_FOLDER') or \
+    datetime.today().strftime('%Y-%m-%d.%H%M%S%f')
+save_path = os.path.join(CONFIGURATIONS_LOCATION, SAVING_FOLDER)
+os.makedirs(save_path, exist_ok='RUNNER_SAVE_FOLDER' in os.environ)
+log_file = f'log.{shard.index}' if shard.count > 1 else 'log'
+
+# folder of the checkpoints of the in-flight simulations, to resume them
+checkpoints_path = os.path.join(save_path, 'checkpoints')
+
+# folder of the generated devices, shared by the campaigns to reuse them (e.g.,
+# '../../res/cache'). If None, the devices are generated each time. The cache
+# keeps the last 'cache.CAPACITY' devices: it must hold the ones of a campaign
+cache_path: Optional[str] = None
+
+# time the phases of the control steps, reporting them in the log at each epoch
+# and saving their trace (Chrome format) at the end of the simulation
+profiling = False
+if profiling:
+    trace_file = os.path.join(save_path, f'trace.{shard.index}.json')
+    setup_profiler(profiler, trace_file)
+
+setup(logger, Settings(
+    path=save_path + '/', log_file=log_file, plot_mode=Settings.Mode.NONE
+))
+setup(
+    logging.getLogger(NNS_LOGGER_NAME),
+    Settings(path=save_path + '/', log_file=log_file)
+)
 logger.info(
     '-' * 47 + '\n' +
     f'Running simulation of task `{task_name}`\n' +
+    f'Shard: {shard.index}/{shard.count}\n' +
     f'Tested densities: {sorted(set(densities))}\n' +
     f'Tested loads: [{", ".join(map("{:.0e}".format, loads))}]\n' +
     '-' * 80
@@ -2,11 +2,17 @@ import dataclasses
 import enum
 import logging
 import matplotlib.pyplot as plot
+import numpy as np
 import os
+import queue
+import threading
 
 from itertools import product
 from nanowire_network_simulator import Evolution, plot as plot_utils
+from networkx import Graph
+from robot.cortex import Cortex, synchronize
 from robot.robot import Robot, unroll
+from typing import Iterable, Tuple
 
 NAME = 'online-mnw-robot-learning'
 
@@ -23,7 +29,12 @@ class Settings(logging.Logger):
      - log_format: the format of the logging from the application
      - plot_file: the format name of the files containing an matplotlib plotting
      - plot_mode: the modalities of showing, saving, doing both or ignoring the
-       plotted graphs.
+       plotted graphs. Just the saved plots are rendered in background: when
+       shown, the plots block the control loop until their window is closed
+     - plot_interval: the ticks between two plots of the cortex. If 0, the
+       cortex is plotted once per epoch (at its last tick)
+     - plot_queue: the cortex snapshots waiting to be saved by the background
+       plotter. When full, the new snapshots are discarded
      - counter: incremental index to not override graphs-plot. It can be changed
     """
 
@@ -42,6 +53,8 @@ class Settings(logging.Logger):
 
     plot_file: str = 'log_plot{idx}.png'
     plot_mode: Mode = Mode.NONE
+    plot_interval: int = 1
+    plot_queue: int = 16
 
     counter = 0
 
@@ -57,6 +70,13 @@ def setup(instance: logging.Logger, settings: Settings):
     """
     instance.plot = lambda plt: log_plot(settings, plt)
     instance.cortex_plot = lambda robot: log_cortex_plot(settings, robot)
+    instance.plot_ticks = lambda duration: plot_ticks(settings, duration)
+
+    # the saved plots are rendered in background, not to stall the robot
+    if settings.plot_mode == Settings.Mode.SAVE:
+        snapshots = plotter(settings)
+        instance.cortex_plot = lambda robot: enqueue(snapshots, robot)
+        instance.plot_flush = snapshots.join
 
     file_path = os.path.join(settings.path, settings.log_file)
     handler = logging.FileHandler(file_path)
@@ -99,16 +119,139 @@ def log_cortex_plot(settings: Settings, robot: Robot):
     if settings.plot_mode == Settings.Mode.NONE:
         return
 
-    body, cortex, pyramid, thalamus = unroll(robot)
+    body, cortex, pyramid, _ = unroll(robot)
+    render(
+        settings, cortex, body.run_frequency.s, pyramid.mapping.values(),
+        pyramid.sensitivity
+    )
+
+
+def render(
+        settings: Settings,
+        cortex: Cortex,
+        delta_time: float,
+        outputs: Iterable[int],
+        load: float
+):
+    """Plot the conductance distribution of the cortex."""
+
     evolution = Evolution(
         cortex.datasheet,
         cortex.wires,
-        body.run_frequency.s,
-        loads=set(product(pyramid.mapping.values(), [pyramid.sensitivity])),
-        network_instances=[(cortex.network, list())]
+        delta_time,
+        loads=set(product(outputs, [load])),
+        network_instances=[(synchronize(cortex), list())]
     )
     plt = plot_utils.plot(evolution, plot_utils.conductance_distribution)
     log_plot(settings, plt)
 
 
+def plot_ticks(settings: Settings, duration: int) -> range:
+    """
+    Get the ticks of an epoch in which the cortex is plotted, according to the
+    plot interval of the settings. The range is empty if plotting is off, so
+    that the control loop skips the plots with just a membership test.
+    """
+
+    if settings.plot_mode == Settings.Mode.NONE:
+        return range(0)
+    if not settings.plot_interval:
+        return range(duration - 1, duration)
+    return range(0, duration, settings.plot_interval)
+
+
+def plotter(settings: Settings) -> queue.Queue:
+    """
+    Start the background plotter of the cortex snapshots and return the bounded
+    queue feeding it. Matplotlib is used only by the plotter thread, with the
+    non-interactive backend (the only one working outside the main thread), as
+    the plots are just saved.
+    """
+
+    plot.switch_backend('agg')
+    snapshots = queue.Queue(settings.plot_queue)
+
+    # copy of the last plotted network, updated with the state of each snapshot
+    copy = dict()
+
+    def work():
+        while True:
+            network, datasheet, wires, vectors, *parameters = snapshots.get()
+
+            # a failed plot is not retried, nor stops the following ones
+            try:
+                # the structure of a network never changes, while its
+                # attributes are overwritten with the state of the snapshot
+                if copy.get('network') is not network:
+                    copy.update(network=network, graph=network.copy())
+                restore(copy['graph'], *vectors)
+                cortex = Cortex(copy['graph'], datasheet, wires)
+                render(settings, cortex, *parameters)
+            except Exception as error:
+                logging.getLogger(NAME).warning(f'Plot failed: {error}')
+            finally:
+                snapshots.task_done()
+
+    threading.Thread(target=work, name='plotter', daemon=True).start()
+    return snapshots
+
+
+def enqueue(snapshots: queue.Queue, robot: Robot):
+    """
+    Queue a snapshot of the cortex state to be plotted. The control loop never
+    waits for the plotter: if the queue is full, the snapshot is discarded.
+    Just the state vectors of the device are copied (see 'state'), while its
+    graph is copied and updated by the plotter.
+    """
+
+    if snapshots.full():
+        return
+
+    body, cortex, pyramid, _ = unroll(robot)
+    try:
+        snapshots.put_nowait((
+            cortex.network, cortex.datasheet, cortex.wires, state(cortex),
+            body.run_frequency.s, list(pyramid.mapping.values()),
+            pyramid.sensitivity
+        ))
+    except queue.Full:
+        pass
+
+
+def state(cortex: Cortex) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Copy the state of the device: the memristive state and the conductance of
+    each junction (in the order of the graph edges) and the voltage of each
+    node (in the order of the graph nodes).
+    """
+
+    if cortex.circuit is not None:
+        vectors = cortex.circuit.g, cortex.circuit.Y, cortex.circuit.V
+        return tuple(_.copy() for _ in vectors)
+
+    network = cortex.network
+    edges = [network.edges(data=_) for _ in ['g', 'Y']]
+    return (
+        *(np.fromiter((value for *_, value in data), float) for data in edges),
+        np.fromiter((value for _, value in network.nodes(data='V')), float)
+    )
+
+
+def restore(graph: Graph, g: np.ndarray, y: np.ndarray, v: np.ndarray):
+    """Write a copied state of the device in the attributes of its graph."""
+
+    voltages = dict(zip(graph.nodes, v.tolist()))
+    for node, voltage in voltages.items():
+        graph.nodes[node]['V'] = voltage
+    for (a, b), state, conductance in zip(graph.edges, g.tolist(), y.tolist()):
+        graph[a][b].update(
+            g=state, Y=conductance, deltaV=abs(voltages[a] - voltages[b])
+        )
+
+
 logger = logging.getLogger(NAME)
+
+# plotting is off until the logger is set up
+logger.cortex_plot = lambda robot: None
+logger.plot_ticks = lambda duration: range(0)
+logger.plot_flush = lambda: None
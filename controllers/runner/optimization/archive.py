@@ -0,0 +1,206 @@
+import json
+import networkx as nx
+import numpy as np
+import os
+import struct
+import zipfile
+
+from nanowire_network_simulator.model.device import Datasheet
+from optimization.biography import History
+from os.path import isfile, join
+from typing import Dict, List, Tuple
+
+# extension of the run artifacts (numpy uncompressed zip archives)
+EXTENSION = '.npz'
+
+# file indexing the archives of a folder, an entry (json object) per line
+MANIFEST = 'manifest.jsonl'
+
+# size of the fixed part of the local header of a zip member
+ZIP_HEADER_SIZE = 30
+
+
+def save(
+        path: str,
+        datasheet: Datasheet,
+        graph: nx.Graph,
+        wires: Dict,
+        io: Dict,
+        stimulus: History,
+        response: History
+):
+    """
+    Save the device and the life of an individual in a single archive. Every
+    array (graph attributes, wires, histories) is an uncompressed member of the
+    archive, so that it can be memory-mapped when read (see 'signals'), while
+    the other data (datasheet, IO mapping, scalars) is stored as json text. The
+    archive is written aside and moved to the path once complete: its presence
+    guarantees its integrity.
+    """
+
+    nodes, edges = list(graph.nodes(data=True)), list(graph.edges(data=True))
+    arrays = {
+        'nodes': np.array([n for n, _ in nodes]),
+        'edges': np.array([(u, v) for u, v, _ in edges]).reshape(-1, 2),
+        **{
+            f'nodes/{k}': np.array([data[k] for _, data in nodes])
+            for k in (nodes[0][1] if nodes else {})
+        },
+        **{
+            f'edges/{k}': np.array([data[k] for *_, data in edges])
+            for k in (edges[0][2] if edges else {})
+        },
+        **{
+            f'wires/{k}': np.asarray(v)
+            for k, v in wires.items() if np.ndim(v)
+        },
+        'stimulus': stimulus.array,
+        'stimulus/columns': np.array(stimulus.columns, dtype=str),
+        'response': response.array,
+        'response/columns': np.array(response.columns, dtype=str)
+    }
+    texts = dict(
+        datasheet=vars(datasheet),
+        connections=io,
+        graph=dict(
+            directed=graph.is_directed(), multigraph=graph.is_multigraph(),
+            attributes=graph.graph
+        ),
+        wires={k: v for k, v in wires.items() if not np.ndim(v)}
+    )
+    texts = {
+        k: np.array(json.dumps(v, default=scalar)) for k, v in texts.items()
+    }
+
+    # the temporary name is unique, as more processes may write the same path
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        np.savez(file, **arrays, **texts)
+    os.replace(temporary, path)
+
+
+def read(path: str) -> Tuple[nx.Graph, Datasheet, Dict, Dict]:
+    """
+    Read the device of an archive: its graph, datasheet, wires and IO mapping
+    (in the order of 'backup.read'). The histories are not loaded.
+    """
+
+    with np.load(path) as archive:
+        def text(name: str): return json.loads(archive[name].item())
+
+        settings = text('graph')
+        family = [
+            [nx.Graph, nx.DiGraph], [nx.MultiGraph, nx.MultiDiGraph]
+        ][settings['multigraph']][settings['directed']]
+        graph = family(**settings['attributes'])
+
+        def attributes(kind: str, count: int):
+            names = [_ for _ in archive.files if _.startswith(f'{kind}/')]
+            values = [archive[_].tolist() for _ in names]
+            names = [_.removeprefix(f'{kind}/') for _ in names]
+            return [dict(zip(names, _)) for _ in zip(*values)] or [{}] * count
+
+        nodes = archive['nodes'].tolist()
+        graph.add_nodes_from(zip(nodes, attributes('nodes', len(nodes))))
+        edges = archive['edges'].tolist()
+        edges = zip(edges, attributes('edges', len(edges)))
+        graph.add_edges_from((u, v, data) for (u, v), data in edges)
+
+        wires = text('wires')
+        wires.update({
+            _.removeprefix('wires/'): archive[_]
+            for _ in archive.files if _.startswith('wires/')
+        })
+
+        datasheet = Datasheet(**text('datasheet'))
+        return graph, datasheet, wires, text('connections')
+
+
+def scalar(value: np.generic):
+    """Convert a numpy scalar (e.g., a seed) to the python one, for json."""
+
+    return value.item()
+
+
+def matrix(path: str, name: str) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """
+    Get the columns and the (steps x columns) values of a history of an archive.
+    The values are a read-only memory-map of the archive member: just the
+    accessed steps are loaded.
+    """
+
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(f'{name}/columns.npy') as file:
+            columns = tuple(np.lib.format.read_array(file).tolist())
+        member = archive.getinfo(f'{name}.npy')
+
+    # compressed members cannot be mapped, thus they are loaded
+    if member.compress_type != zipfile.ZIP_STORED:
+        with np.load(path) as archive:
+            return columns, archive[name]
+
+    with open(path, 'rb') as file:
+
+        # skip the local header of the member to get to the npy file
+        file.seek(member.header_offset)
+        header = file.read(ZIP_HEADER_SIZE)
+        name_size, extra_size = struct.unpack('<HH', header[-4:])
+        file.seek(name_size + extra_size, os.SEEK_CUR)
+
+        # read the npy header to get the layout of the data that follows
+        version = np.lib.format.read_magic(file)
+        shape, fortran, dtype = (
+            np.lib.format.read_array_header_1_0(file) if version == (1, 0)
+            else np.lib.format.read_array_header_2_0(file)
+        )
+        offset = file.tell()
+
+    if not np.prod(shape):
+        return columns, np.empty(shape, dtype)
+    return columns, np.memmap(
+        path, dtype, 'r', offset, shape, 'F' if fortran else 'C'
+    )
+
+
+def signals(path: str, name: str) -> Dict[str, np.ndarray]:
+    """
+    Get a history of an archive ('stimulus' or 'response') in the collapsed form
+    {transducer: values}, where the values are memory-mapped (see 'matrix').
+    """
+
+    columns, values = matrix(path, name)
+    return {k: values[:, i] for i, k in enumerate(columns)}
+
+
+def history(path: str, name: str) -> History:
+    """Load in memory a history of an archive ('stimulus' or 'response')."""
+
+    columns, values = matrix(path, name)
+    instance = History(columns, len(values))
+    instance.data[:], instance.size = values, len(values)
+    return instance
+
+
+def register(folder: str, entry: Dict):
+    """
+    Add the entry of an archive to the manifest of its folder. The entry is
+    appended in a single write, as more processes can share the same folder.
+    """
+
+    with open(join(folder, MANIFEST), 'a') as file:
+        file.write(json.dumps(entry, default=scalar) + '\n')
+
+
+def entries(folder: str) -> List[Dict]:
+    """
+    Get the entries of the manifest of a folder, ordered by simulation index
+    (the last registered one, for an index registered more times). If there is
+    no manifest, the list is empty.
+    """
+
+    if not isfile(join(folder, MANIFEST)):
+        return []
+    with open(join(folder, MANIFEST)) as file:
+        lines = map(json.loads, filter(str.strip, file))
+        indexed = {_['index']: _ for _ in lines}
+    return [indexed[_] for _ in sorted(indexed)]
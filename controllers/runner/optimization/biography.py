@@ -1,6 +1,74 @@
+import numpy as np
+
 from dataclasses import dataclass, field
+from math import isnan
 from optimization.fitness import Fitness
-from typing import List, Dict
+from profiler import profiler
+from robot.component import sensor
+from robot.component.motor import Motor
+from robot.fiber import Fiber, transducers
+from robot.observation import Observation, Observations
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+from utils import mapper
+
+# default number of steps for which the histories are preallocated
+CAPACITY = 256
+
+
+class History(Sequence[Dict[str, float]]):
+    """
+    Columnar record of the values of some transducers (the columns) at each step
+    (the rows). The values are stored in a preallocated array, grown when full.
+    For compatibility, it behaves as the list of the steps as dictionaries; the
+    missing values of a step are not part of its dictionary. If not given, the
+    columns are the keys of the first appended step.
+    """
+
+    def __init__(self, columns: Iterable[str] = (), capacity: int = CAPACITY):
+        self.columns = tuple(columns)
+        self.data = np.full((capacity, len(self.columns)), np.nan)
+        self.size = 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """Return the recorded values (steps x columns) as an array view."""
+        return self.data[:self.size]
+
+    def append(self, step: Dict[str, float]):
+        """Record the values of a step, writing them in place."""
+
+        if not self.columns and step:
+            self.columns = tuple(step)
+            self.data = np.full((len(self.data), len(self.columns)), np.nan)
+
+        if self.size == len(self.data):
+            grown = np.full((max(1, 2 * self.size), len(self.columns)), np.nan)
+            grown[:self.size] = self.data
+            self.data = grown
+
+        self.data[self.size] = [step.get(_, np.nan) for _ in self.columns]
+        self.size += 1
+
+    def extend(self, steps: Iterable[Dict[str, float]]):
+        for step in steps:
+            self.append(step)
+
+    def __len__(self) -> int: return self.size
+
+    def __getitem__(
+            self,
+            index: Union[int, slice]
+    ) -> Union[Dict[str, float], List[Dict[str, float]]]:
+        if isinstance(index, slice):
+            return [*map(self.row, self.array[index])]
+        return self.row(self.array[index])
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        return map(self.row, self.array)
+
+    def row(self, values: np.ndarray) -> Dict[str, float]:
+        pairs = zip(self.columns, values.tolist())
+        return {k: v for k, v in pairs if not isnan(v)}
 
 
 @dataclass(frozen=True)
@@ -11,5 +79,73 @@ class Biography:
     """
 
     evaluator: Fitness
-    stimulus: List[Dict[str, float]] = field(default_factory=list)
-    response: List[Dict[str, float]] = field(default_factory=list)
+    stimulus: History = field(default_factory=History)
+    response: History = field(default_factory=History)
+
+
+def new(
+        evaluator: Fitness,
+        sensors: Fiber,
+        motors: Fiber,
+        duration: int = CAPACITY
+) -> Biography:
+    """
+    Get an empty biography, with the histories columns in the order of the
+    thalamus (sensors) and pyramid (motors) mappings, preallocated for a life of
+    the given duration.
+    """
+
+    return Biography(
+        evaluator,
+        History(transducers(sensors), duration),
+        History(transducers(motors), duration)
+    )
+
+
+def record(instance: Biography, observation: Observation):
+    """
+    Update the evaluator with the observation of a step and add its stimulus and
+    response to the histories.
+    """
+
+    tick = profiler.clock()
+    instance.evaluator.update(observation)
+    tick = profiler.record('fitness', tick)
+    instance.stimulus.append(observation.stimulus)
+    instance.response.append(observation.response)
+    profiler.record('biography', tick)
+
+
+def observations(
+        instance: Biography,
+        multiplier: Dict[str, float],
+        working_range: Tuple[float, float] = (0.0, 10.0)
+) -> Observations:
+    """
+    Reconstruct the observations of a recorded life from its histories: the
+    sensors readings from the network stimulus (removing the multiplier of each
+    sensor) and the motors speeds from the network response. The readings that
+    saturated the network inputs are reconstructed at their saturation value.
+    The sensors with a null multiplier are not observable by the network: they
+    are reconstructed at the minimum of their range.
+    """
+
+    def normalize(values: np.ndarray, factor: float) -> np.ndarray:
+        if not factor:
+            return np.zeros_like(values)
+        return values / working_range[1] / factor
+
+    stimulus, response = instance.stimulus, instance.response
+    normalized = {
+        k: normalize(stimulus.array[:, i], multiplier.get(k, 1.0))
+        for i, k in enumerate(stimulus.columns)
+    }
+    readings = {
+        k: mapper(out_range=sensor(k).range())(v) for k, v in normalized.items()
+    }
+    to_speed = mapper(out_range=Motor.range(reverse=True))
+    speeds = {
+        k: to_speed(response.array[:, i])
+        for i, k in enumerate(response.columns)
+    }
+    return Observations(readings, normalized, speeds)
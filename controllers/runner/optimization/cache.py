@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+
+from nanowire_network_simulator.model.device import Datasheet
+from optimization import archive
+from optimization.biography import History
+from os.path import join
+from robot.cortex import new as new_cortex, Cortex, synchronize, to_sparse
+from typing import Callable
+
+# maximum number of devices kept in a cache folder, enough for the devices of a
+# whole campaign (that would evict its own devices before reusing them)
+CAPACITY = 1024
+
+# version of the cached data, to change when the generation of devices changes
+VERSION = 1
+
+
+def cached(
+        folder: str,
+        capacity: int = CAPACITY
+) -> Callable[[Datasheet, bool], Cortex]:
+    """
+    Get a function generating the cortex of a datasheet (as 'cortex.new'), that
+    reuses the devices already generated in the cache folder. The devices are
+    identified by the hash of their datasheet (that includes the seed), thus
+    the folder can be shared by different campaigns and processes. When full,
+    the least recently used devices are evicted.
+    """
+
+    os.makedirs(folder, exist_ok=True)
+
+    def supplier(datasheet: Datasheet, sparse: bool = False) -> Cortex:
+        path = join(folder, key(datasheet) + archive.EXTENSION)
+
+        # a device can be evicted while being read by another process
+        try:
+            graph, _, wires, _ = archive.read(path)
+            os.utime(path)
+            instance = Cortex(graph, datasheet, wires)
+            return to_sparse(instance) if sparse else instance
+        except OSError:
+            pass
+
+        instance = new_cortex(datasheet, sparse)
+        archive.save(
+            path, datasheet, synchronize(instance), instance.wires, dict(),
+            History(), History()
+        )
+        evict(folder, capacity)
+        return instance
+
+    return supplier
+
+
+def key(datasheet: Datasheet) -> str:
+    """Get the content hash identifying the device of a datasheet."""
+
+    content = dict(vars(datasheet), version=VERSION)
+    content = json.dumps(content, sort_keys=True, default=archive.scalar)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def evict(folder: str, capacity: int):
+    """Delete the least recently used devices exceeding the cache capacity."""
+
+    paths = [
+        join(folder, _) for _ in os.listdir(folder)
+        if _.endswith(archive.EXTENSION)
+    ]
+    paths = sorted(paths, key=os.path.getmtime, reverse=True)
+    for path in paths[capacity:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
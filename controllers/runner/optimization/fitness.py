@@ -1,21 +1,32 @@
 from abc import abstractmethod
-from robot.body import EPuck
+from robot.component import grounds, sensor
+from robot.observation import Observation, Observations
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+# webots is needed just to evaluate the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
 
 
 class Fitness:
     """
     Define the structure of a fitness calculator.
-    The measure is evaluated during an epoch duration.
+    The measure is evaluated during an epoch duration, updating it at each step
+    (see 'update'), or at once on the recorded steps of a life (see 'evaluate').
+    Without a robot, the evaluator can just score recorded lives.
     """
 
-    def __init__(self, robot: EPuck):
+    # attributes bound to the world, that are not part of the measure state
+    bindings: Tuple[str, ...] = ('robot',)
+
+    def __init__(self, robot: Optional['EPuck'] = None):
         self.robot = robot
 
     @abstractmethod
-    def update(self):
+    def update(self, observation: Observation):
         """
-        Update the fitness measure by looking at the actual robot state.
-        To be called after each simulation step.
+        Update the fitness measure by looking at the actual robot state, as
+        observed in the step. To be called after each simulation step.
         """
         NotImplemented()
 
@@ -23,3 +34,18 @@ class Fitness:
     def value(self) -> float:
         """Get fitness measured so far."""
         return NotImplemented()
+
+    @abstractmethod
+    def evaluate(self, observations: Observations) -> float:
+        """
+        Get the fitness of the observed steps of a life, computed on all of them
+        at once. It is the value that the updates with each step would give,
+        starting from the current state of the evaluator (that is unchanged).
+        """
+        return NotImplemented()
+
+
+def ground(sensors: Iterable[str]) -> str:
+    """Get the ground sensor perceiving the floor color, between the sensors."""
+
+    return next(iter(grounds(map(sensor, sensors))))
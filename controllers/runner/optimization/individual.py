@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from logger import logger
 from optimization.fitness import Fitness
-from optimization.biography import Biography
+from optimization.biography import Biography, new as new_biography, record
+from profiler import profiler
 from robot.robot import Robot, run, unroll
 from robot.thalamus import evolve_connections, evolve_multiplier, random
 
@@ -24,18 +25,20 @@ class Individual(Robot):
 def live(individual: Individual, duration: int):
     """Evaluate the individual in the given task."""
 
+    # ticks in which the cortex is plotted (none, if plotting is off)
+    plotted = logger.plot_ticks(duration)
+
     # iterate for the epoch duration
-    for _ in range(duration):
+    for counter in range(duration):
 
         # run the individual and save the biography for the step
-        stimulus, response = run(individual)
-        individual.biography.evaluator.update()
-        individual.biography.stimulus.append(stimulus)
-        individual.biography.response.append(response)
+        record(individual.biography, run(individual))
 
-        logger.cortex_plot(individual)
+        if counter in plotted:
+            logger.cortex_plot(individual)
 
     logger.info(f'fitness: {individual.biography.evaluator.value()}')
+    profiler.report(logger)
 
 
 def evolve(
@@ -55,4 +58,5 @@ def evolve(
         thalamus = evolve_multiplier(thalamus, mutation_sigma)
     else:
         thalamus = random(body, cortex, pyramid, mutation_sigma)
-    return Individual(body, cortex, pyramid, thalamus, Biography(evaluator))
+    biography = new_biography(evaluator, thalamus.mapping, pyramid.mapping)
+    return Individual(body, cortex, pyramid, thalamus, biography)
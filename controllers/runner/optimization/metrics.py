@@ -0,0 +1,40 @@
+import json
+
+from optimization.archive import scalar
+from optimization.simulation import Simulation
+from os.path import join
+from robot.cortex import connected_density, density
+from typing import Callable
+
+# file of the metrics of a folder, a record (json object) per line
+FILE = 'metrics.jsonl'
+
+
+def recorder(folder: str, index: int) -> Callable[[Simulation], None]:
+    """
+    Get a function appending the metrics of the simulation (with the given
+    index) to the stream of the folder. A record describes the elite at the end
+    of an epoch (the epoch 0 is its first life): the device it runs on, its
+    connections and its fitness, that is the best one reached in the epochs.
+    The stream can be read while the simulations run (see 'analysis.fitness').
+    """
+
+    path = join(folder, FILE)
+
+    def _(instance: Simulation):
+        elite = instance.elite
+        record = dict(
+            configuration=index,
+            density=density(elite.cortex),
+            cc_density=connected_density(elite.cortex),
+            load=elite.pyramid.sensitivity,
+            multiplier=elite.thalamus.multiplier,
+            epoch=instance.epoch,
+            fitness=elite.fitness
+        )
+
+        # a record is appended in a single write, as the stream can be shared
+        with open(path, 'a') as file:
+            file.write(json.dumps(record, default=scalar) + '\n')
+
+    return _
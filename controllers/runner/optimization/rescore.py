@@ -0,0 +1,132 @@
+import json
+
+from collections import defaultdict
+from functools import partial
+from multiprocessing import Pool
+from nanowire_network_simulator import backup
+from optimization import archive
+from optimization.biography import Biography, History, observations
+from optimization.fitness import Fitness
+from os import listdir
+from os.path import isfile, join
+from robot.cortex import Cortex, connected_density, density
+from robot.observation import Observations
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+# score of the observed steps of a life (e.g., the one of an evaluator)
+Formula = Callable[[Observations], float]
+
+# files of a saved life: its archive, or the data files of the old runs
+Source = Tuple[str, ...]
+
+# data files of a life of the old runs, named as '{name}.{index}.dat'
+LEGACY = (
+    'datasheet', 'network', 'wires', 'connections', 'stimulus', 'response'
+)
+
+
+def evaluation(kind: Type[Fitness]) -> Formula:
+    """
+    Get the formula of an evaluator class: each life is scored by a new
+    instance (see 'Fitness.evaluate'). Differently from a lambda, the formula
+    can be sent to other processes. The evaluators needing what the lives do
+    not record (e.g., the t-maze and run ones) raise a 'ValueError'.
+    """
+
+    return partial(evaluate, kind)
+
+
+def evaluate(kind: Type[Fitness], instance: Observations) -> float:
+    return kind().evaluate(instance)
+
+
+def sources(folder: str) -> List[Source]:
+    """
+    Get the files of the lives saved in a folder, ordered by simulation index.
+    The lives are the archives in the manifest or, for the old runs without it,
+    the data files grouped by index (see 'utils.legacy'). The indexes missing
+    some of their files (e.g., of an interrupted run) are skipped.
+    """
+
+    if isfile(join(folder, archive.MANIFEST)):
+        return [(join(folder, _['archive']),) for _ in archive.entries(folder)]
+
+    files = defaultdict(dict)
+    for file in listdir(folder):
+        name, _, index = file.removesuffix('.dat').partition('.')
+        if file.endswith('.dat') and name in LEGACY and index.isdigit():
+            files[int(index)][name] = join(folder, file)
+    return [
+        tuple(map(files[_].get, LEGACY))
+        for _ in sorted(files) if len(files[_]) == len(LEGACY)
+    ]
+
+
+def load(source: Source) -> Tuple[Tuple, History, History]:
+    """
+    Read a saved life: its device (as in 'archive.read') and its stimulus and
+    response histories.
+    """
+
+    if len(source) == 1:
+        path, = source
+        return (
+            archive.read(path),
+            archive.history(path, 'stimulus'),
+            archive.history(path, 'response')
+        )
+
+    *device, stimulus, response = source
+    histories = History(), History()
+    for history, path in zip(histories, [stimulus, response]):
+        with open(path) as file:
+            history.extend(json.load(file))
+    return (backup.read(*device), *histories)
+
+
+def score(formula: Formula, source: Source) -> Dict:
+    """
+    Score a saved life with the formula. Return its configuration in the form
+    of the fitness datasets (see 'analysis.fitness.dataset'): the properties of
+    the device, the sensors multipliers and the new fitness, as the only one of
+    the list. The lives without multipliers (e.g., the old ones, that saved an
+    empty list) had all the multipliers set to 1.
+    """
+
+    (graph, datasheet, wires, io), stimulus, response = load(source)
+    cortex = Cortex(graph, datasheet, wires)
+
+    multiplier = io.get('multiplier')
+    if not isinstance(multiplier, dict) or not multiplier:
+        multiplier = dict.fromkeys(io['inputs'], 1.0)
+    life = Biography(Fitness(), stimulus, response)
+    fitness = formula(observations(life, multiplier, cortex.working_range))
+
+    return dict(
+        density=density(cortex),
+        cc_density=connected_density(cortex),
+        load=io['load'],
+        avg_multiplier=sum(multiplier.values()) / len(multiplier) * 100,
+        multiplier=multiplier,
+        fitness=[float(fitness)]
+    )
+
+
+def rescore(
+        folder: str,
+        formula: Formula,
+        processes: Optional[int] = None
+) -> List[Dict]:
+    """
+    Score the lives saved in a folder with a new formula, without simulating
+    them again. The lives are scored in parallel by the given number of
+    processes (by default, one per cpu); the formula must be picklable (see
+    'evaluation'). Return a configuration per life, ordered by simulation
+    index (see 'score').
+    """
+
+    task = partial(score, formula)
+    if processes == 1:
+        return [*map(task, sources(folder))]
+    with Pool(processes) as pool:
+        return pool.map(task, sources(folder))
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, TypeVar
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    Identifies the part of the simulations run by a worker process, when the
+    simulations are distributed between 'count' workers. The simulations are
+    assigned round-robin: the worker 'index' runs the ones whose (global) index
+    is index, index + count, index + 2 * count, and so on.
+    """
+
+    index: int = 0
+    count: int = 1
+
+    def select(self, items: Iterable[T]) -> Iterable[T]:
+        """Lazily select the items of the shard, skipping the others."""
+        return islice(items, self.index, None, self.count)
+
+    def position(self, local_index: int) -> int:
+        """Convert the index of an item in the shard to its global index."""
+        return self.index + local_index * self.count
+
+
+def parse(value: str) -> Shard:
+    """Parse a shard in the 'index/count' format (e.g., '2/8')."""
+
+    index, count = map(int, value.split('/'))
+    if not 0 <= index < count:
+        raise ValueError(f'Invalid shard: {value}')
+    return Shard(index, count)
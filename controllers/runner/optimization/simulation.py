@@ -1,12 +1,21 @@
 import random
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from functools import reduce
 from logger import logger
+from optimization.biography import new as new_biography
 from optimization.individual import Individual, evolve
 from optimization.task.task import Task
+from profiler import profiler
+from robot.body import EPuck
+from robot.cortex import clone
 from robot.robot import describe
-from typing import Any
+from robot.surrogate import Surrogate
+from typing import Callable, Dict, Optional, Tuple
+
+# fraction of the elite surrogate-fitness (in absolute value) that a challenger
+# can lose in the surrogate world to still be evaluated in the real one
+SCREENING_TOLERANCE = 0.1
 
 
 @dataclass(frozen=True)
@@ -17,12 +26,39 @@ class Simulation:
     Note that this class does not want to represent a step in the evolution,
     instead, it aims to define its starting or ending point. The step approach
     can be however obtained setting a epoch count and an epoch duration of 1.
+    If a surrogate body is given, the challengers are pre-screened in it and
+    only the promising ones are evaluated in the (slower) real world. The
+    strategy searches the best individual of the simulation (see 'optimize').
+    The index identifies the simulation in its set, also when just a shard of
+    the set is run (e.g., in the names of its checkpoints and archive).
+    A simulation resumed from a checkpoint starts from the given epoch, with
+    the saved state of the random generator and of the strategy search (e.g.,
+    the CMA-ES distribution, see 'strategy.cma'). If a checkpoint function is
+    set, it is called with the in-flight simulation at the end of each epoch.
+    The metrics function, if set, is called the same way and also after the
+    first life of the elite (see 'metrics.recorder').
     """
 
     elite: Individual
     goal_task: Task
     epochs_count: int
     epoch_duration: int
+    surrogate: Optional[Surrogate] = None
+    strategy: Optional[Callable[['Simulation'], Individual]] = None
+
+    # global index of the simulation in its set (also when run in a shard)
+    index: int = 0
+
+    # evolution progress (for simulations resumed from a checkpoint)
+    epoch: int = 0
+    random_state: Optional[Tuple] = field(default=None, repr=False)
+    search: Optional[Dict] = field(default=None, repr=False)
+    checkpoint: Optional[Callable[['Simulation'], None]] = field(
+        default=None, compare=False, repr=False
+    )
+    metrics: Optional[Callable[['Simulation'], None]] = field(
+        default=None, compare=False, repr=False
+    )
 
 
 def optimize(instance: Simulation) -> Simulation:
@@ -30,52 +66,160 @@ def optimize(instance: Simulation) -> Simulation:
     Optimize a static robot configuration (body + cortex) through the run of a
     simulation of individuals with different thalamus (the changing part).
     In other words, find the best thalamus to connect body and cortex in order
-    to achieve the desired task.
+    to achieve the desired task. The search follows the strategy of the
+    simulation, that is the (1+1) elitist one if none is specified.
     """
 
     logger.info(describe(instance.elite))
 
-    # set controller random seed
-    random.seed(instance.elite.cortex.datasheet.seed)
+    # set controller random seed (or restore it, if resuming the simulation)
+    if instance.random_state:
+        random.setstate(instance.random_state)
+    else:
+        random.seed(instance.elite.cortex.datasheet.seed)
 
     # restore simulation to starting point
     instance.elite.body.simulationReset()
 
-    # run the initial individual to obtain its fitness
-    instance.goal_task.life_manager(instance.elite, instance.epoch_duration)
+    # run the initial individual to obtain its fitness (a resumed one has it)
+    if instance.epoch:
+        logger.info(f'Resuming simulation from epoch {instance.epoch}')
+    else:
+        instance.goal_task.life_manager(instance.elite, instance.epoch_duration)
+        if instance.metrics:
+            instance.metrics(instance)
+
+    # find the best configuration in the given task and world
+    winner = (instance.strategy or elitist)(instance)
+    return update_elite(winner, instance)
+
+
+def elitist(instance: Simulation) -> Individual:
+    """
+    The (1+1) strategy: at each epoch the elite is compared with a challenger
+    that may or not be its evolution. The one with the highest score survives.
+    """
+
+    # surrogate fitness of the elite, evaluated again only when it changes
+    screening = [None, 0.0]
 
-    def strategy(elite: Individual, _: Any) -> Individual:
+    def strategy(elite: Individual, epoch: int) -> Individual:
         """
         Reduction strategy. Given an individual, it compares it with another one
         that may or not be its evolution. Select the one with the highest score.
         """
 
+        winner = compete(elite)
+        progress(instance, winner, epoch)
+        return winner
+
+    def compete(elite: Individual) -> Individual:
+        """Get the best between the elite and one of its challengers."""
+
         # get the challenger individual (may or not be an evolution of elite)
-        task = instance.goal_task
-        evaluator = task.evaluator(elite.body)
-        threshold, sigma = task.evolution_threshold, task.mutation_sigma
-        challenger = evolve(elite, threshold, sigma, evaluator)
+        challenger = challenge(elite, instance)
+
+        # discard the challengers that are not promising in the surrogate world
+        if instance.surrogate:
+            if screening[0] is not elite:
+                screening[:] = elite, screen(elite, instance)
+            if not promising(screen(challenger, instance), screening[1]):
+                return elite
 
         # restore simulation to starting point
-        if not task.continuous:
-            challenger.body.simulationReset()
+        if not instance.goal_task.continuous:
+            restore(challenger.body)
 
         # run the challenger to obtain its fitness
         instance.goal_task.life_manager(challenger, instance.epoch_duration)
 
         return challenger if challenger.fitness >= elite.fitness else elite
 
-    # find the best configuration in the given task and world
-    winner = reduce(strategy, range(instance.epochs_count), instance.elite)
-    return update_elite(winner, instance)
+    epochs = range(instance.epoch, instance.epochs_count)
+    return reduce(strategy, epochs, instance.elite)
+
+
+def challenge(parent: Individual, instance: Simulation) -> Individual:
+    """
+    Get a challenger individual from the parent: its evolution if the parent is
+    fit enough, a random one otherwise.
+    """
+
+    task = instance.goal_task
+    evaluator = task.evaluator(parent.body)
+    threshold, sigma = task.evolution_threshold, task.mutation_sigma
+    return evolve(parent, threshold, sigma, evaluator)
+
+
+def progress(
+        instance: Simulation,
+        elite: Individual,
+        epoch: int,
+        search: Optional[Dict] = None
+):
+    """
+    Checkpoint the simulation and record its metrics at the end of the epoch,
+    if requested. The state of the strategy search, if any, must be json data.
+    """
+
+    if instance.checkpoint:
+        instance.checkpoint(replace(
+            instance, elite=elite, epoch=epoch + 1, search=search
+        ))
+    if instance.metrics:
+        instance.metrics(replace(instance, elite=elite, epoch=epoch + 1))
+
+
+def restore(body: EPuck):
+    """
+    Restore the world of the body to its initial state (see 'EPuck.restore'),
+    timing it as the reset phase of the profiler.
+    """
+
+    tick = profiler.clock()
+    body.restore()
+    profiler.record('reset', tick)
+
+
+def promising(score: float, elite_score: float) -> bool:
+    """
+    Tell if a challenger surrogate-fitness is close enough to the elite one to
+    evaluate the challenger in the real world. The tolerance is relative to the
+    magnitude of the elite score, so that it is looser whatever its sign.
+    """
+
+    return score >= elite_score - SCREENING_TOLERANCE * abs(elite_score)
+
+
+def screen(individual: Individual, instance: Simulation) -> float:
+    """
+    Evaluate the individual in the surrogate world of the simulation. It runs on
+    a copy of the cortex, so that the state of the real device is not affected.
+    """
+
+    body, task = instance.surrogate, instance.goal_task
+    body.simulationReset()
+    twin = replace(
+        individual,
+        body=body,
+        cortex=clone(individual.cortex),
+        biography=new_biography(
+            task.evaluator(body), individual.thalamus.mapping,
+            individual.pyramid.mapping, instance.epoch_duration
+        )
+    )
+
+    # the surrogate lives are not part of the log
+    logger.disabled = True
+    try:
+        task.life_manager(twin, instance.epoch_duration)
+    finally:
+        logger.disabled = False
+
+    return twin.fitness
 
 
 def update_elite(elite: Individual, instance: Simulation) -> Simulation:
     """Update a previous simulation with a new elite individual."""
 
-    return Simulation(
-        elite,
-        instance.goal_task,
-        instance.epochs_count,
-        instance.epoch_duration
-    )
+    return replace(instance, elite=elite)
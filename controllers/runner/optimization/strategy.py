@@ -0,0 +1,408 @@
+import numpy as np
+import random
+
+from dataclasses import dataclass, field, replace
+from logger import logger
+from math import exp, floor, log, sqrt
+from optimization.biography import new as new_biography, record
+from optimization.individual import Individual
+from optimization.simulation import Simulation, challenge, progress, restore
+from profiler import profiler
+from robot.cortex import clone
+from robot.observation import observe
+from robot.robot import actuate, run_batch
+from robot.surrogate import Surrogate
+from robot.thalamus import Thalamus
+from typing import Callable, Dict, List, Optional, Sequence
+
+Strategy = Callable[[Simulation], Individual]
+"""Search the best individual of a simulation, starting from its elite."""
+
+Evaluator = Callable[[Simulation, Sequence[Individual]], List[Individual]]
+"""
+Let the individuals live an epoch in the world of the simulation and return
+them as evaluated (i.e., with their fitness).
+"""
+
+Selection = Callable[[Sequence[Individual], int], List[Individual]]
+"""Select the given number of individuals (with repetitions) from a group."""
+
+
+def sequential(
+        instance: Simulation,
+        individuals: Sequence[Individual]
+) -> List[Individual]:
+    """Evaluate the individuals one after the other in the simulation world."""
+
+    task = instance.goal_task
+    for individual in individuals:
+        if not task.continuous:
+            restore(individual.body)
+        task.life_manager(individual, instance.epoch_duration)
+    return list(individuals)
+
+
+def batch(
+        instance: Simulation,
+        individuals: Sequence[Individual]
+) -> List[Individual]:
+    """
+    Evaluate the individuals all together, each in its own copy of the surrogate
+    world and with a clone of its cortex. At each step their (sparse) networks
+    are stimulated at once. The returned individuals are the clones: the
+    original ones are left untouched. As the clones lived just in the surrogate
+    world, they live in the real one before winning (see 'promoted'). The life
+    manager of the task is not used, thus the worlds are neither prepared for
+    each life (as in the t-maze) nor moved (as the dynamic ones): such tasks
+    are not supported.
+    """
+
+    if instance.surrogate is None:
+        raise ValueError('Batched evaluation requires a surrogate world')
+    task = instance.goal_task
+    if not task.continuous:
+        raise ValueError('Batched evaluation requires a continuous task')
+    if getattr(task.life_manager, 'dynamic', False):
+        raise ValueError('Batched evaluation requires a static world')
+
+    sensors, arena = instance.surrogate.sensors, instance.surrogate.arena
+    evaluator = task.evaluator
+
+    def twin(individual: Individual) -> Individual:
+        body = Surrogate(sensors, arena)
+        return replace(
+            individual,
+            body=body,
+            cortex=clone(individual.cortex),
+            biography=new_biography(
+                evaluator(body), individual.thalamus.mapping,
+                individual.pyramid.mapping, instance.epoch_duration
+            )
+        )
+
+    twins = [*map(twin, individuals)]
+    for _ in range(instance.epoch_duration):
+        for body in (_.body for _ in twins):
+            body.step(body.run_frequency.ms)
+        observations = [observe(_.body, dict()) for _ in twins]
+        outputs = run_batch(twins, [_.normalized for _ in observations])
+        for individual, observation, (stimulus, response) in zip(
+                twins, observations, outputs
+        ):
+            speeds = actuate(individual, response)
+            record(individual.biography, replace(
+                observation, speeds=speeds, stimulus=stimulus, response=response
+            ))
+    profiler.report(logger)
+
+    return twins
+
+
+def promoted(instance: Simulation, individual: Individual) -> Individual:
+    """
+    Get the individual as lived in the world of the simulation. An individual
+    evaluated in the surrogate world (see 'batch') lives again, with the body
+    and the device of the elite, so that its fitness is the real one.
+    """
+
+    elite, task = instance.elite, instance.goal_task
+    if individual.body is elite.body:
+        return individual
+
+    return sequential(instance, [replace(
+        individual,
+        body=elite.body,
+        cortex=elite.cortex,
+        biography=new_biography(
+            task.evaluator(elite.body), individual.thalamus.mapping,
+            individual.pyramid.mapping, instance.epoch_duration
+        )
+    )])[0]
+
+
+def truncation(group: Sequence[Individual], count: int) -> List[Individual]:
+    """Select the best individuals of the group."""
+
+    return sorted(group, key=lambda _: _.fitness, reverse=True)[:count]
+
+
+def tournament(size: int = 2) -> Selection:
+    """
+    Get a tournament selection: each individual is the best of 'size' ones
+    randomly sampled from the group.
+    """
+
+    def select(group: Sequence[Individual], count: int) -> List[Individual]:
+        def match(): return random.sample(group, min(size, len(group)))
+        return [max(match(), key=lambda _: _.fitness) for _ in range(count)]
+
+    return select
+
+
+def plus(
+        mu: int,
+        lam: int,
+        parents: Selection = tournament(),
+        evaluate: Evaluator = sequential
+) -> Strategy:
+    """
+    Get a (mu+lambda) evolution strategy: at each epoch 'lam' challengers are
+    generated from parents selected in the population. The best 'mu' between
+    the population and the challengers survive.
+    """
+
+    return population(mu, lam, True, parents, evaluate)
+
+
+def comma(
+        mu: int,
+        lam: int,
+        parents: Selection = tournament(),
+        evaluate: Evaluator = sequential
+) -> Strategy:
+    """
+    Get a (mu,lambda) evolution strategy: at each epoch 'lam' challengers are
+    generated from parents selected in the population. The best 'mu' of the
+    challengers replace the population.
+    """
+
+    if lam < mu:
+        raise ValueError('A (mu,lambda) strategy requires lambda >= mu')
+    return population(mu, lam, False, parents, evaluate)
+
+
+def population(
+        mu: int,
+        lam: int,
+        elitism: bool,
+        parents: Selection,
+        evaluate: Evaluator
+) -> Strategy:
+    """
+    Get a population based strategy. The best individual ever evaluated is the
+    winner, also when it does not survive (i.e., without elitism). The best
+    challenger of an epoch lives in the world of the simulation (if it did not)
+    when it scores more than all the previous ones. Just the best individual is
+    checkpointed: a resumed simulation restarts the population from it.
+    """
+
+    def strategy(instance: Simulation) -> Individual:
+
+        # the elite has already lived in the world of the simulation
+        group = [instance.elite]
+        if evaluate is not sequential:
+            group = evaluate(instance, group)
+        best, bound = instance.elite, group[0].fitness
+
+        for epoch in range(instance.epoch, instance.epochs_count):
+            challengers = [challenge(_, instance) for _ in parents(group, lam)]
+            challengers = evaluate(instance, challengers)
+
+            # as in the (1+1) strategy, challengers win the ties
+            group = truncation(
+                challengers + group if elitism else challengers, mu
+            )
+            leader = max(challengers, key=lambda _: _.fitness)
+            if leader.fitness >= bound:
+                bound, leader = leader.fitness, promoted(instance, leader)
+                best = max([leader, best], key=lambda _: _.fitness)
+            logger.info(f'generation {epoch}, best score {group[0].fitness}')
+            progress(instance, best, epoch)
+
+        return best
+
+    return strategy
+
+
+@dataclass
+class Distribution:
+    """
+    State of the multivariate normal distribution adapted by the CMA-ES. The
+    parameters follow 'The CMA Evolution Strategy: A Tutorial' (N. Hansen).
+    """
+
+    mean: np.ndarray
+    sigma: float
+    lam: int
+    generator: np.random.Generator
+
+    # selection and adaptation parameters (set from the size of the problem)
+    weights: np.ndarray = field(init=False)
+    settings: dict = field(init=False)
+
+    # evolution paths and covariance matrix (with its eigen-decomposition)
+    pc: np.ndarray = field(init=False)
+    ps: np.ndarray = field(init=False)
+    C: np.ndarray = field(init=False)
+    B: np.ndarray = field(init=False)
+    D: np.ndarray = field(init=False)
+    generation: int = 0
+
+    def __post_init__(self):
+        n, mu = len(self.mean), self.lam // 2
+        weights = log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+        mueff = 1.0 / np.sum(self.weights ** 2)
+
+        c1 = 2.0 / ((n + 1.3) ** 2 + mueff)
+        cs = (mueff + 2) / (n + mueff + 5)
+        self.settings = dict(
+            mueff=mueff,
+            cc=(4 + mueff / n) / (n + 4 + 2 * mueff / n),
+            cs=cs,
+            c1=c1,
+            cmu=min(
+                1 - c1, 2 * (mueff - 2 + 1 / mueff) / ((n + 2) ** 2 + mueff)
+            ),
+            damps=1 + 2 * max(0.0, sqrt((mueff - 1) / (n + 1)) - 1) + cs,
+            chi=sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+        )
+        self.pc, self.ps = np.zeros(n), np.zeros(n)
+        self.C, self.B, self.D = np.eye(n), np.eye(n), np.ones(n)
+
+
+def sample(instance: Distribution) -> np.ndarray:
+    """Sample 'lam' points from the distribution (one per row)."""
+
+    z = instance.generator.standard_normal((instance.lam, len(instance.mean)))
+    return instance.mean + instance.sigma * (z * instance.D) @ instance.B.T
+
+
+def update(instance: Distribution, points: np.ndarray, scores: Sequence[float]):
+    """Move the distribution toward the best (highest scoring) points."""
+
+    s, n = instance.settings, len(instance.mean)
+    mu = len(instance.weights)
+    selected = points[np.argsort(scores)[::-1][:mu]]
+
+    # update the mean and the evolution paths
+    old, instance.mean = instance.mean, instance.weights @ selected
+    step = (instance.mean - old) / instance.sigma
+    inverse_root = instance.B @ np.diag(1 / instance.D) @ instance.B.T
+    instance.ps = (1 - s['cs']) * instance.ps + sqrt(
+        s['cs'] * (2 - s['cs']) * s['mueff']
+    ) * inverse_root @ step
+    instance.generation += 1
+    norm = np.linalg.norm(instance.ps) / sqrt(
+        1 - (1 - s['cs']) ** (2 * instance.generation)
+    )
+    hsig = norm / s['chi'] < 1.4 + 2 / (n + 1)
+    instance.pc = (1 - s['cc']) * instance.pc + hsig * sqrt(
+        s['cc'] * (2 - s['cc']) * s['mueff']
+    ) * step
+
+    # update the covariance matrix (rank-one and rank-mu) and the step size
+    steps = (selected - old) / instance.sigma
+    instance.C = (
+        (1 - s['c1'] - s['cmu']) * instance.C
+        + s['c1'] * (
+            np.outer(instance.pc, instance.pc)
+            + (1 - hsig) * s['cc'] * (2 - s['cc']) * instance.C
+        )
+        + s['cmu'] * (steps.T * instance.weights) @ steps
+    )
+    instance.sigma *= exp(
+        (s['cs'] / s['damps']) * (np.linalg.norm(instance.ps) / s['chi'] - 1)
+    )
+
+    # decompose the (symmetric) covariance matrix to sample the next points
+    instance.C = (instance.C + instance.C.T) / 2
+    eigenvalues, instance.B = np.linalg.eigh(instance.C)
+    instance.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+
+def state(instance: Distribution) -> Dict:
+    """Get the state of the distribution as json data (see 'from_state')."""
+
+    return dict(
+        mean=instance.mean.tolist(),
+        sigma=instance.sigma,
+        lam=instance.lam,
+        generator=instance.generator.bit_generator.state,
+        pc=instance.pc.tolist(),
+        ps=instance.ps.tolist(),
+        C=instance.C.tolist(),
+        B=instance.B.tolist(),
+        D=instance.D.tolist(),
+        generation=instance.generation
+    )
+
+
+def from_state(data: Dict) -> Distribution:
+    """Get the distribution with the given state (see 'state')."""
+
+    generator = np.random.default_rng()
+    generator.bit_generator.state = data['generator']
+    instance = Distribution(
+        np.array(data['mean']), data['sigma'], data['lam'], generator
+    )
+    for name in ['pc', 'ps', 'C', 'B', 'D']:
+        setattr(instance, name, np.array(data[name]))
+    instance.generation = data['generation']
+    return instance
+
+
+def cma(
+        lam: Optional[int] = None,
+        evaluate: Evaluator = sequential
+) -> Strategy:
+    """
+    Get a CMA-ES strategy over the sensors multipliers of the elite thalamus
+    (its connections are not evolved). The initial step size is the mutation
+    sigma of the task, while 'lam' defaults to the size suggested for the
+    number of sensors. As in the population strategies, the best challenger of
+    an epoch lives in the world of the simulation when it scores more than all
+    the previous ones. The distribution is checkpointed with the simulation, so
+    that a resumed search continues from it.
+    """
+
+    def strategy(instance: Simulation) -> Individual:
+        elite, task = instance.elite, instance.goal_task
+        sensors = list(elite.thalamus.multiplier)
+        mean = np.array([elite.thalamus.multiplier[_] for _ in sensors])
+
+        # a resumed search continues with its distribution (and generator)
+        if instance.search:
+            distribution = from_state(instance.search['distribution'])
+        else:
+            distribution = Distribution(
+                mean, task.mutation_sigma,
+                lam or 4 + floor(3 * log(len(sensors))),
+                np.random.default_rng(random.getrandbits(32))
+            )
+
+        def individual(point: np.ndarray) -> Individual:
+            multiplier = dict(zip(sensors, np.maximum(point, 0.0).tolist()))
+            return replace(
+                elite,
+                thalamus=Thalamus(elite.thalamus.mapping, multiplier),
+                biography=new_biography(
+                    task.evaluator(elite.body), elite.thalamus.mapping,
+                    elite.pyramid.mapping, instance.epoch_duration
+                )
+            )
+
+        # the elite has already lived in the world of the simulation
+        best, bound = elite, elite.fitness
+        if instance.search:
+            bound = instance.search['bound']
+        elif evaluate is not sequential:
+            bound = evaluate(instance, [elite])[0].fitness
+
+        for epoch in range(instance.epoch, instance.epochs_count):
+            points = sample(distribution)
+            challengers = evaluate(instance, [*map(individual, points)])
+            scores = [_.fitness for _ in challengers]
+            update(distribution, points, scores)
+            leader = max(challengers, key=lambda _: _.fitness)
+            if leader.fitness >= bound:
+                bound, leader = leader.fitness, promoted(instance, leader)
+                best = max([leader, best], key=lambda _: _.fitness)
+            logger.info(f'generation {epoch}, best score {max(scores)}')
+            progress(instance, best, epoch, dict(
+                distribution=state(distribution), bound=bound
+            ))
+
+        return best
+
+    return strategy
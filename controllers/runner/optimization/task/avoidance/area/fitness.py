@@ -1,14 +1,23 @@
-from functools import reduce
-from operator import sub
-from optimization.fitness import Fitness as Base
-from robot.component import grounds
+import numpy as np
+
+from optimization.fitness import Fitness as Base, ground
 from robot.component.motor import Motor
-from utils import adapt
+from robot.observation import Observation, Observations
+from typing import TYPE_CHECKING, Optional
+from utils import mapper
 from world.colors import Colors
 
+# webots is needed just to evaluate the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
+
 
 PENALTY = 100
 
+# map of the motors velocities to the range 0-1, and of the averaged fitness
+SPEED = mapper(Motor.range())
+SCORE = mapper((-100, 1), (0, 100))
+
 
 class Fitness(Base):
     """
@@ -24,12 +33,17 @@ class Fitness(Base):
     to the range [0, 100].
     """
 
-    fitness: float = 0.0
-    counter: int = 0
+    def __init__(self, robot: Optional['EPuck'] = None):
+        Base.__init__(self, robot)
+        self.fitness, self.counter = 0.0, 0
+
+        # sensor of the floor color (known once the readings are)
+        self.ground = ground(robot.sensors) if robot else None
 
-    def update(self):
-        # get the highest (nearer) proximity measure and make it in range 0-1
-        floor_color = next(iter(grounds(self.robot.sensors))).read()
+    def update(self, observation: Observation):
+        # get the floor color, as perceived by the ground sensor
+        self.ground = self.ground or ground(observation.readings)
+        floor_color = observation.readings[self.ground]
 
         # map color to discrete values
         floor_color = Colors.convert(floor_color)
@@ -39,12 +53,11 @@ class Fitness(Base):
             self.fitness -= PENALTY
 
         # get motors velocities and make them in range 0-1
-        speeds = [motor.speed for motor in self.robot.motors]
-        speeds = [adapt(value, in_range=Motor.range()) for value in speeds]
+        left, right = map(SPEED, observation.speeds.values())
 
         # calculate average speed and direction of the robot
-        average_speed = sum(speeds) / 2.0
-        directions = 1 - abs(reduce(sub, speeds))
+        average_speed = (left + right) / 2.0
+        directions = 1 - abs(left - right)
 
         # prefer straight and fast movements
         self.fitness += directions * average_speed
@@ -53,4 +66,19 @@ class Fitness(Base):
     def value(self) -> float:
         if self.counter == 0:
             return 0.0
-        return adapt(self.fitness / self.counter, (-100, 1), (0, 100))
+        return SCORE(self.fitness / self.counter)
+
+    def evaluate(self, observations: Observations) -> float:
+        readings = observations.readings
+        floor_colors = Colors.levels(readings[ground(readings)])
+        penalties = PENALTY * (floor_colors == Colors.WHITE.value)
+
+        left, right = map(SPEED, observations.speeds.values())
+        average_speed = (left + right) / 2.0
+        directions = 1 - np.abs(left - right)
+
+        fitness = directions * average_speed - penalties
+        counter = self.counter + len(fitness)
+        if counter == 0:
+            return 0.0
+        return SCORE((self.fitness + fitness.sum()) / counter)
@@ -1,27 +1,36 @@
-from functools import reduce
+import numpy as np
+
 from math import sqrt
-from operator import sub
 from optimization.fitness import Fitness as Base
 from robot.component.motor import Motor
-from utils import adapt
+from robot.observation import Observation, Observations
+from typing import TYPE_CHECKING, Optional
+from utils import mapper
+
+# webots is needed just to evaluate the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
+
+# map of the motors velocities to the range 0-1
+SPEED = mapper(Motor.range())
 
 
 class Fitness(Base):
     """Calculate the fitness depending on collision avoidance capabilities"""
 
-    fitness: float = 0
-    counter: int = 0
+    def __init__(self, robot: Optional['EPuck'] = None):
+        Base.__init__(self, robot)
+        self.fitness, self.counter = 0.0, 0
 
-    def update(self):
+    def update(self, observation: Observation):
         # get the highest (nearer) proximity measure and make it in range 0-1
-        max_proximity = max(s.read(normalize=True) for s in self.robot.sensors)
+        max_proximity = max(observation.normalized.values())
 
         # get motors velocities and make them in range 0-1
-        speeds = [motor.speed for motor in self.robot.motors]
-        speeds = [adapt(value, Motor.range()) for value in speeds]
+        left, right = map(SPEED, observation.speeds.values())
 
-        average_speed = sum(speeds) / 2.0
-        directions = 1 - abs(reduce(sub, speeds))
+        average_speed = (left + right) / 2.0
+        directions = 1 - abs(left - right)
 
         self.fitness += (1 - sqrt(max_proximity)) * directions * average_speed
         self.counter += 1
@@ -30,3 +39,16 @@ class Fitness(Base):
         if self.counter == 0:
             return 0.0
         return 100 * self.fitness / self.counter
+
+    def evaluate(self, observations: Observations) -> float:
+        max_proximity = np.max([*observations.normalized.values()], axis=0)
+        left, right = map(SPEED, observations.speeds.values())
+
+        average_speed = (left + right) / 2.0
+        directions = 1 - np.abs(left - right)
+
+        fitness = (1 - np.sqrt(max_proximity)) * directions * average_speed
+        counter = self.counter + len(fitness)
+        if counter == 0:
+            return 0.0
+        return 100 * (self.fitness + fitness.sum()) / counter
@@ -1,22 +1,48 @@
 from collections.abc import Callable
 
 from logger import logger
+from optimization.biography import record
 from optimization.individual import Individual
-from random import random
+from profiler import profiler
 from robot.robot import run
 from world.manager import Manager
-from typing import Iterable
+from world.motion import advance, new as new_motion, steer
+from typing import TYPE_CHECKING, Iterable
+
+# webots is needed just by the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
 
 
 UPDATE_TIME = 100
 
+# maximum shift of a moving object on each axis of the ground, per step
+SPEED = 0.0025
+
 
 def supplier(
         objects: Iterable[str],
-        force_in_arena: Callable[[float], float],
+        bound: float,
         dynamic: bool = False
 ) -> Callable[[Individual, int], None]:
-    """Returns a life management that can work with movable objects."""
+    """
+    Returns a life management that can work with movable objects. If dynamic,
+    the objects move randomly, within the given distance from the center of the
+    world (see 'world.motion').
+    """
+
+    objects = list(objects)
+
+    # the managers of the world keep their handles between the lives: the one
+    # of the robot is reused, while one is built for each other body
+    managers = dict()
+
+    def manager(body: 'EPuck') -> Manager:
+        if hasattr(body, 'world'):
+            return body.world
+        if body not in managers:
+            managers[body] = Manager(body, 'evolvable')
+        return managers[body]
 
     def live(instance: Individual, duration: int):
         """
@@ -25,36 +51,33 @@ def supplier(
         random selected side to reach (defined by starting floor color)
         """
 
-        # save the manager of the world
-        world_manager = Manager(instance.body, 'evolvable')
-        multiplier, delta = 0.005, [[0, 0, 0] for _ in range(6)]
+        # the objects positions are read just once, and only if they move
+        if live.dynamic:
+            world_manager = manager(instance.body)
+            motion = new_motion(world_manager, objects, bound)
+
+        # ticks in which the cortex is plotted (none, if plotting is off)
+        plotted = logger.plot_ticks(duration)
 
         # iterate for the epoch duration
         for counter in range(duration):
 
-            # get object position and update them
-            positions = filter(None, map(world_manager.position, objects))
-
-            # update object directions
-            if not counter % UPDATE_TIME:
-                delta = [[random() - 0.5, 0, random() - 0.5] for _ in range(6)]
-                delta = [[_ * multiplier for _ in p] for p in delta]
-
+            # move the objects (periodically changing their direction); the
+            # moves take place with the next step of the robot
             if live.dynamic:
-                for a, p, d in zip(objects, positions, delta):
-                    new_p = [*map(force_in_arena, map(sum, zip(p, d)))]
-                    world_manager.move(a, new_p, can_intersect=False)
-                world_manager.commit(ensure=True)
+                if not counter % UPDATE_TIME:
+                    steer(motion, SPEED)
+                advance(motion, world_manager)
+                world_manager.commit(ensure=False)
 
             # run the individual and save the biography for the step
-            stimulus, response = run(instance)
-            instance.biography.evaluator.update()
-            instance.biography.stimulus.append(stimulus)
-            instance.biography.response.append(response)
+            record(instance.biography, run(instance))
 
-            logger.cortex_plot(instance)
+            if counter in plotted:
+                logger.cortex_plot(instance)
 
         logger.info(f'fitness: {instance.biography.evaluator.value()}')
+        profiler.report(logger)
 
     live.dynamic = dynamic
 
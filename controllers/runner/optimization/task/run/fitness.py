@@ -1,35 +1,53 @@
-from functools import reduce
-from math import sqrt
-from operator import add
+import numpy as np
+
+from math import dist
 from optimization.fitness import Fitness as Base
-from robot.body import EPuck
+from robot.observation import Observation, Observations
+from typing import TYPE_CHECKING, Optional
+
+# webots is needed just to evaluate the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
 
 
 class Fitness(Base):
     """Calculate the distance travelled by the robot"""
 
-    # travelled distance
-    distance: float = 0.0
+    bindings = (*Base.bindings, 'translation')
 
-    def __init__(self, robot: EPuck):
+    def __init__(self, robot: Optional['EPuck'] = None):
         """Initialize the evaluator and save the robot instance"""
         Base.__init__(self, robot)
 
+        # travelled distance
+        self.distance = 0.0
+
         # get robot node and get its position field
-        self.translation = robot.getFromDef('evolvable').getField('translation')
+        self.translation = robot and robot.getFromDef('evolvable').getField(
+            'translation'
+        )
 
         # get position of the robot at the step (x, y, z)
-        self.position = self.translation.getSFVec3f()[:2]
+        self.position = self.translation and self.translation.getSFVec3f()[:2]
 
-    def update(self):
+    def update(self, _: Observation):
         # get position of the robot at the step (x, y, z)
         new_position = self.translation.getSFVec3f()[:2]
 
         # update distance adding travelled distance (euclidean)
-        points = zip(self.position, new_position)
-        self.distance += sqrt(reduce(add, [pow(x - y, 2) for x, y in points]))
+        self.distance += dist(self.position, new_position)
 
         # update position
         self.position = new_position
 
     def value(self) -> float: return self.distance
+
+    def evaluate(self, observations: Observations) -> float:
+        if observations.positions is None:
+            raise ValueError('The travelled distance requires the positions')
+
+        positions = np.asarray(observations.positions)[:, :2]
+        if self.position is not None:
+            positions = np.vstack([self.position, positions])
+        steps = np.diff(positions, axis=0)
+        return self.distance + np.sqrt((steps ** 2).sum(axis=1)).sum()
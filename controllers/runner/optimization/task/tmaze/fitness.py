@@ -1,8 +1,18 @@
-from optimization.fitness import Fitness as Base
-from robot.component import grounds
-from utils import adapt
+import numpy as np
+
+from optimization.fitness import Fitness as Base, ground
+from robot.observation import Observation, Observations
+from typing import TYPE_CHECKING, Optional
+from utils import mapper
 from world.colors import Colors
 
+# webots is needed just to evaluate the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
+
+# map of the averaged fitness to the range 0-100
+SCORE = mapper((-1, 2), (0, 100))
+
 
 class Fitness(Base):
     """
@@ -18,19 +28,25 @@ class Fitness(Base):
     The formula gives a prize if the robot is not in the initial or gray floor
     and gives a penalty if it is in the initial one. The fitness are then
     averaged and the resulting range [-1, 2] is adapted to the range [0, 100].
+    When evaluating recorded steps, the initial color is the one currently set:
+    the lives do not record it, thus it is required.
     """
 
-    initial_color = Colors.NONE
+    def __init__(self, robot: Optional['EPuck'] = None):
+        Base.__init__(self, robot)
+        self.initial_color = Colors.NONE
+        self.fitness, self.counter = 0.0, 0
 
-    fitness: float = 0.0
-    counter: int = 0
+        # sensor of the floor color (known once the readings are)
+        self.ground = ground(robot.sensors) if robot else None
 
-    def update(self):
+    def update(self, observation: Observation):
         # increment iteration counter
         self.counter += 1
 
-        # get first ground-sensor reading
-        floor_level = next(iter(grounds(self.robot.sensors))).read()
+        # get the ground-sensor reading
+        self.ground = self.ground or ground(observation.readings)
+        floor_level = observation.readings[self.ground]
 
         # map reading to discrete values
         floor_level = Colors.convert(floor_level)
@@ -49,4 +65,21 @@ class Fitness(Base):
     def value(self) -> float:
         if self.counter == 0:
             return 0.0
-        return adapt(self.fitness / self.counter, (-1, 2), (0, 100))
+        return SCORE(self.fitness / self.counter)
+
+    def evaluate(self, observations: Observations) -> float:
+        if self.initial_color == Colors.NONE:
+            raise ValueError('The t-maze evaluation requires the initial color')
+
+        readings = observations.readings
+        floor_levels = Colors.levels(readings[ground(readings)])
+
+        # colors are the same if their values are close (see 'Colors')
+        initial = np.abs(floor_levels - self.initial_color.value) < 50
+        fitness = np.where(initial, -1, 2)
+        fitness = np.where(floor_levels == Colors.GRAY.value, 0, fitness)
+
+        counter = self.counter + len(fitness)
+        if counter == 0:
+            return 0.0
+        return SCORE((self.fitness + fitness.sum()) / counter)
@@ -1,6 +1,8 @@
 from itertools import cycle
 from logger import logger
+from optimization.biography import record
 from optimization.individual import Individual
+from profiler import profiler
 from robot.robot import run
 from world.colors import Colors
 from world.manager import Manager
@@ -26,6 +28,9 @@ def live(instance: Individual, duration: int):
     # save the manager of the world
     world_manager = Manager(instance.body, 'evolvable')
 
+    # ticks in which the cortex is plotted (none, if plotting is off)
+    plotted = logger.plot_ticks(duration)
+
     # iterate for the epoch duration
     for counter in range(duration):
         if not counter % DURATION:
@@ -46,11 +51,10 @@ def live(instance: Individual, duration: int):
             instance.biography.evaluator.initial_color = starting_color
 
         # run the individual and save the biography for the step
-        stimulus, response = run(instance)
-        instance.biography.evaluator.update()
-        instance.biography.stimulus.append(stimulus)
-        instance.biography.response.append(response)
+        record(instance.biography, run(instance))
 
-        logger.cortex_plot(instance)
+        if counter in plotted:
+            logger.cortex_plot(instance)
 
     logger.info('fitness: ' + str(instance.biography.evaluator.value()))
+    profiler.report(logger)
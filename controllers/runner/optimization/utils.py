@@ -1,80 +1,254 @@
 import json
+import numpy as np
+import os
+import random
+import shutil
 
+from dataclasses import dataclass, replace
+from enum import Enum
 from nanowire_network_simulator import backup
 from nanowire_network_simulator.model.device.datasheet import factory as ds
-from optimization.biography import Biography
+from optimization import archive
+from optimization.biography import new as new_biography
+from optimization.cache import cached
+from optimization.fitness import Fitness
 from optimization.individual import Individual
+from optimization.shard import Shard
 from optimization.simulation import Simulation
-from optimization.task import Task
+from optimization.strategy import Strategy
+from optimization.task import Task, Tasks
 from os import listdir
-from os.path import join, isfile, exists
+from os.path import basename, dirname, join, isfile, exists
 from robot.robot import unroll
 from robot.body import EPuck
-from robot.cortex import new as new_cortex, Cortex
+from robot.cortex import new as new_cortex, Cortex, density, synchronize
+from robot.cortex import to_sparse
 from robot.pyramid import random as random_pyramid, Pyramid
+from robot.surrogate import Surrogate
 from robot.thalamus import random as random_thalamus, Thalamus
-from typing import Iterable, Tuple
+from typing import Callable, Container, Dict, Iterable, Optional, Tuple
 
 DEVICE_SIZE = 50
 WIRES_LENGTH = 10.0
 READING_FOLDER = 'controllers/'
 
+# number of epochs between two checkpoints of an in-flight simulation
+CHECKPOINT_INTERVAL = 1
+
+# task, epochs count and duration, surrogate body and strategy of simulations
+Settings = Tuple[Task, int, int, Optional[Surrogate], Optional[Strategy]]
+
+
+@dataclass(frozen=True)
+class SimulationSpec:
+    """
+    Lightweight description of a simulation to generate. It holds just the
+    settings of the device and the names of the task and of the epochs, thus it
+    is cheap to keep in memory and to send to another process, where it is
+    expanded in the actual simulation (see 'expand').
+    """
+
+    task: str
+    epochs_count: int
+    epoch_duration: int
+
+    # nano-wires density, motors load and seed of the device
+    density: float
+    load: float
+    seed: int
+
+    # size of the device and mean length of its wires
+    size: int = DEVICE_SIZE
+    wires_length: float = WIRES_LENGTH
+
+    # global index of the simulation in its set
+    index: int = 0
+
 
 def new_simulations(
         robot: EPuck,
-        simulation_configuration: Tuple[Task, int, int],
+        simulation_configuration: Settings,
         device_configurations: Iterable[Tuple[float, float, int]],
         size: int = DEVICE_SIZE, wires_length: float = WIRES_LENGTH,
+        sparse: bool = False,
+        shard: Shard = Shard(),
+        checkpoints: Optional[str] = None,
+        cache: Optional[str] = None,
+        skip: Container[int] = ()
 ) -> Iterable[Simulation]:
     """
     Generate a simulations set with each instance using a device with a
-    different nano-wires density, seed and load.
+    different nano-wires density, seed and load. If 'sparse' is set, the
+    devices are backed by their sparse representation. Only the simulations
+    of the given shard are generated. If a checkpoints folder is given, the
+    simulations are resumed from it (see 'resume'). If a cache folder is given,
+    the devices already generated there are reused (see 'cache.cached'). The
+    simulations with the indexes to skip (e.g., the ones already saved) are not
+    generated at all.
+    """
+
+    *_, surrogate, strategy = simulation_configuration
+    specs = shard.select(specify(
+        simulation_configuration, device_configurations, size, wires_length
+    ))
+    specs = filter(lambda _: _.index not in skip, specs)
+
+    # lazily expand the specification of each setting and return them
+    simulations = map(
+        lambda _: expand(_, robot, (surrogate, strategy), sparse, cache), specs
+    )
+    if checkpoints:
+        simulations = resumed(simulations, robot, checkpoints, sparse)
+    return simulations
+
+
+def specify(
+        simulation_configuration: Settings,
+        device_configurations: Iterable[Tuple[float, float, int]],
+        size: int = DEVICE_SIZE, wires_length: float = WIRES_LENGTH
+) -> Iterable[SimulationSpec]:
+    """
+    Lazily get the specification of the simulation of each device setting
+    (density, load and seed), indexed by the position of the setting. The task
+    has to be one of 'Tasks'.
     """
 
-    task, epoch_count, epoch_duration = simulation_configuration
+    task, epoch_count, epoch_duration, *_ = simulation_configuration
+    names = [_.name for _ in Tasks if _.value is task]
+    if not names:
+        raise ValueError('The task of the simulations is not one of Tasks')
 
-    def generate(setting: Tuple[float, float, int]):
-        """Create device datasheet and use it to instantiate the simulation."""
+    return map(
+        lambda _: SimulationSpec(
+            names[0], epoch_count, epoch_duration, *_[1], size, wires_length,
+            _[0]
+        ),
+        enumerate(device_configurations)
+    )
 
-        density, load, seed = setting
-        datasheet = ds.from_density(density, size, wires_length, seed)
 
-        cortex = new_cortex(datasheet)
-        pyramid = random_pyramid(robot, cortex, load)
-        thalamus = random_thalamus(robot, cortex, pyramid)
-        biography = Biography(task.evaluator(robot))
-        elite = Individual(robot, cortex, pyramid, thalamus, biography)
+def expand(
+        spec: SimulationSpec,
+        robot: EPuck,
+        search: Tuple[Optional[Surrogate], Optional[Strategy]] = (None, None),
+        sparse: bool = False,
+        cache: Optional[str] = None
+) -> Simulation:
+    """
+    Instantiate the simulation of a specification, generating its device. The
+    surrogate body and the strategy of the search (see 'Settings') are the
+    ones of the process, as the robot. If 'sparse' is set, the device is backed
+    by its sparse representation. If a cache folder is given, the device is
+    reused if already generated there (see 'cache.cached'). The connections of
+    the device to the robot are chosen by the seed of the specification, thus
+    they are the same whether the device is generated or reused.
+    """
+
+    task = Tasks[spec.task].value
+    datasheet = ds.from_density(
+        spec.density, spec.size, spec.wires_length, spec.seed
+    )
 
-        return Simulation(elite, task, epoch_count, epoch_duration)
+    cortex = (cached(cache) if cache else new_cortex)(datasheet, sparse)
+    random.seed(spec.seed)
+    pyramid = random_pyramid(robot, cortex, spec.load)
+    thalamus = random_thalamus(robot, cortex, pyramid)
+    biography = new_biography(
+        task.evaluator(robot), thalamus.mapping, pyramid.mapping,
+        spec.epoch_duration
+    )
+    elite = Individual(robot, cortex, pyramid, thalamus, biography)
 
-    # lazily generate a simulation for each setting and return them
-    return map(generate, device_configurations)
+    return Simulation(
+        elite, task, spec.epochs_count, spec.epoch_duration, *search,
+        index=spec.index
+    )
 
 
 def import_simulations(
         robot: EPuck,
-        simulation_configuration: Tuple[Task, int, int],
+        simulation_configuration: Settings,
         folder: str = READING_FOLDER,
+        sparse: bool = False,
+        shard: Shard = Shard(),
+        checkpoints: Optional[str] = None,
+        where: Optional[Callable[[Dict], bool]] = None,
+        skip: Container[int] = ()
 ) -> Iterable[Simulation]:
     """
     Check if there are simulations files in the given folder.
     Return an iterable with the imported simulations instances.
     If the folder does not exists or if there are not files, return an empty
-    list.
+    list. If 'sparse' is set, the devices are backed by their sparse
+    representation. Only the simulations of the given shard are imported. If a
+    checkpoints folder is given, the simulations interrupted mid-evolution are
+    resumed from it (see 'resume'). If 'where' is given, just the simulations
+    whose manifest entry satisfies it are imported (e.g., the ones with density
+    7.5: lambda _: _['density'] == 7.5); the entries are described in 'save'.
+    The old runs, without a manifest, are imported entirely. The simulations
+    with the indexes to skip (e.g., the ones already saved) are not read.
     """
 
     # check that the folder exists
     if not exists(folder):
         return []
 
+    # the old runs have no manifest: their files are listed and grouped instead
+    if not isfile(join(folder, archive.MANIFEST)):
+        chunks = legacy(folder, shard, skip)
+    else:
+        # select the simulations from the manifest, without reading their files
+        entries = archive.entries(folder)
+        entries = [*filter(where, entries)] if where else entries
+
+        # skip the simulations of other shards (or to skip) before reading them
+        selected = filter(
+            lambda _: _['index'] not in skip, shard.select(entries)
+        )
+        chunks = entries and map(
+            lambda _: (_['index'], archive.read(join(folder, _['archive']))),
+            selected
+        )
+
+    # if the folder does not contains simulations, return an empty list
+    # this is needed to identify lack of instances without import all the graphs
+    if not chunks:
+        return []
+
+    task, epoch_count, epoch_duration, *search = simulation_configuration
+
+    # instantiate simulation with the given controller/device (and index)
+    def simulation(chunk: Tuple[int, Tuple]) -> Simulation:
+        index, settings = chunk
+        elite = individual(robot, task, settings, sparse)
+        return Simulation(
+            elite, task, epoch_count, epoch_duration, *search, index=index
+        )
+
+    # return a lazy mapping to the simulations
+    simulations = map(simulation, chunks)
+    if checkpoints:
+        simulations = resumed(simulations, robot, checkpoints, sparse)
+    return simulations
+
+
+def legacy(
+        folder: str,
+        shard: Shard,
+        skip: Container[int] = ()
+) -> Iterable[Tuple]:
+    """
+    Read the simulations of the old runs, saved as 6 files each without a
+    manifest: the folder is listed and the files are grouped by simulation
+    index. Each simulation is returned with its index, but the ones to skip.
+    If the folder does not contain data files, return an empty list.
+    """
+
     # find files in the given folder
     files = filter(isfile, map(lambda s: join(folder, s), listdir(folder)))
 
     # get data files (exclude any other extension file)
     files = list(filter(lambda _: _.endswith('.dat'), files))
-
-    # if the folder does not contains data files, return an empty list
-    # this is needed to identify lack of instances without import all the graphs
     if not files:
         return []
 
@@ -87,50 +261,211 @@ def import_simulations(
     # discard sensors/actuators history files (indexes: 0, 4) & order others
     chunks = map(lambda _: _[1:][:2] + _[-1:] + _[:1], chunks)
 
+    # index them by the names of the files, skipping the simulations of other
+    # shards (or to skip) before reading them
+    chunks = map(lambda _: (int(_[0].split('.')[-2]), _), shard.select(chunks))
+    chunks = filter(lambda _: _[0] not in skip, chunks)
+
     # convert files to python data
-    chunks = map(lambda _: backup.read(*_), chunks)
+    return map(lambda _: (_[0], backup.read(*_[1])), chunks)
+
 
-    task, epoch_count, epoch_duration = simulation_configuration
+def individual(
+        robot: EPuck,
+        task: Task,
+        settings: Tuple,
+        sparse: bool = False
+) -> Individual:
+    """Instantiate an individual from its data, as read from the files."""
 
-    # instantiate simulation with the given controller/device
-    def simulation(settings: Tuple) -> Simulation:
-        graph, datasheet, wires, io = settings
+    graph, datasheet, wires, io = settings
 
-        cortex = Cortex(graph, datasheet, wires)
-        pyramid = Pyramid(io['outputs'], io['load'])
-        multiplier = dict(zip(inputs := io['inputs'], [1] * len(inputs)))
-        thalamus = Thalamus(inputs, io.get('multiplier', multiplier))
-        biography = Biography(task.evaluator(robot))
-        elite = Individual(robot, cortex, pyramid, thalamus, biography)
+    cortex = Cortex(graph, datasheet, wires)
+    cortex = to_sparse(cortex) if sparse else cortex
+    pyramid = Pyramid(io['outputs'], io['load'])
+    # the old runs saved an empty list when the multipliers were all 1
+    multiplier = io.get('multiplier')
+    if not isinstance(multiplier, dict) or not multiplier:
+        multiplier = dict.fromkeys(io['inputs'], 1)
+    thalamus = Thalamus(io['inputs'], multiplier)
+    evaluator = task.evaluator(robot)
+    biography = new_biography(evaluator, thalamus.mapping, pyramid.mapping)
 
-        return Simulation(elite, task, epoch_count, epoch_duration)
+    return Individual(robot, cortex, pyramid, thalamus, biography)
 
-    # return a lazy mapping to the simulations
-    return map(simulation, chunks)
+
+def resumed(
+        simulations: Iterable[Simulation],
+        robot: EPuck,
+        folder: str,
+        sparse: bool
+) -> Iterable[Simulation]:
+    """Lazily resume the simulations (by their global index)."""
+
+    for instance in simulations:
+        yield resume(instance, robot, folder, instance.index, sparse)
+
+
+def resume(
+        instance: Simulation,
+        robot: EPuck,
+        folder: str,
+        index: int,
+        sparse: bool = False
+) -> Simulation:
+    """
+    Continue the simulation from its checkpoint in the folder, if there is one,
+    and let it save its next checkpoints there (see 'checkpoint'). The elite,
+    the epoch, the state of the random generator, of the strategy search and of
+    the evaluator are the saved ones.
+    """
+
+    instance = replace(instance, checkpoint=checkpointer(folder, index))
+
+    # a checkpoint is complete when its state has been written (the last file)
+    path = join(folder, str(index))
+    if not isfile(join(path, 'state.json')):
+        path += '.new'
+    if not isfile(join(path, 'state.json')):
+        return instance
+
+    with open(join(path, 'state.json')) as file:
+        state = json.load(file)
+
+    # read the elite and its history
+    path = join(path, f'elite{archive.EXTENSION}')
+    elite = individual(robot, instance.goal_task, archive.read(path), sparse)
+    set_measure(elite.biography.evaluator, state['evaluator'])
+    elite = replace(elite, biography=replace(
+        elite.biography,
+        stimulus=archive.history(path, 'stimulus'),
+        response=archive.history(path, 'response')
+    ))
+
+    version, internal, gauss = state['random']
+    return replace(
+        instance,
+        elite=elite,
+        epoch=state['epoch'],
+        random_state=(version, tuple(internal), gauss),
+        search=state.get('search')
+    )
+
+
+def checkpointer(
+        folder: str,
+        index: int,
+        interval: int = CHECKPOINT_INTERVAL
+) -> Callable[[Simulation], None]:
+    """Get a function checkpointing the simulation every 'interval' epochs."""
+
+    def _(instance: Simulation):
+        if not instance.epoch % interval:
+            checkpoint(instance, folder, index)
+    return _
+
+
+def checkpoint(instance: Simulation, folder: str, index: int):
+    """
+    Save the in-flight simulation in the checkpoints folder. Besides the elite
+    files, its state contains the epoch, the state of the random generator and
+    of the strategy search, and the measure of the elite evaluator (see
+    'measure').
+    The files are written in a new folder, that replaces the previous checkpoint
+    only once completed.
+    """
+
+    path = join(folder, str(index))
+    os.makedirs(path + '.new', exist_ok=True)
+    save(instance.elite, join(path + '.new', f'elite{archive.EXTENSION}'))
+
+    state = dict(
+        epoch=instance.epoch,
+        random=random.getstate(),
+        search=instance.search,
+        evaluator=measure(instance.elite.biography.evaluator)
+    )
+    with open(join(path + '.new', 'state.json'), 'w') as file:
+        json.dump(state, file)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(path + '.new', path)
+
+
+def measure(evaluator: Fitness) -> Dict:
+    """
+    Get the state of the measure of an evaluator as json data: its attributes,
+    but the ones bound to the world. The enumerations are saved by name and the
+    sequences as lists, while the other values cannot be saved (a 'TypeError'
+    is raised, instead of losing them).
+    """
+
+    state = dict()
+    for name, value in vars(evaluator).items():
+        if name in evaluator.bindings:
+            continue
+        if isinstance(value, Enum):
+            value = value.name
+        elif isinstance(value, (list, tuple, np.ndarray, np.generic)):
+            value = np.asarray(value).tolist()
+        elif not isinstance(value, (bool, int, float, str, type(None))):
+            raise TypeError(f'Cannot checkpoint the evaluator attribute {name}')
+        state[name] = value
+    return state
 
 
-def save(instance: Individual, file_format: str = '{name}.dat'):
-    """Save epoch information into files with the given format name"""
+def set_measure(evaluator: Fitness, state: Dict):
+    """
+    Set the measure of an evaluator to the saved state (see 'measure'), with
+    the types of its current attributes.
+    """
+
+    for name, value in state.items():
+        current = getattr(evaluator, name, None)
+        if isinstance(current, Enum):
+            value = type(current)[value]
+        elif isinstance(current, np.ndarray):
+            value = np.asarray(value)
+        elif isinstance(current, tuple):
+            value = tuple(value)
+        setattr(evaluator, name, value)
+
+
+def discard_checkpoint(folder: str, index: int):
+    """Delete the checkpoint of a simulation (e.g., once it has ended)."""
+
+    shutil.rmtree(join(folder, str(index)), ignore_errors=True)
+
+
+def save(instance: Individual, path: str, index: Optional[int] = None):
+    """
+    Save the controller characteristics and the sensor/motor states during the
+    simulation in an archive at the given path (see 'archive.save'). If the
+    index of the simulation is given, the archive is registered in the manifest
+    of its folder, with the density, load and seed of the device and the score
+    of the individual.
+    """
 
     _, cortex, pyramid, thalamus = unroll(instance)
 
-    # save controller characteristics
-    backup.save(
-        cortex.datasheet, cortex.network, cortex.wires,
+    archive.save(
+        path, cortex.datasheet, synchronize(cortex), cortex.wires,
         dict(
             inputs=thalamus.mapping,
             outputs=pyramid.mapping,
             load=pyramid.sensitivity,
             multiplier=thalamus.multiplier
         ),
-        file_format.format(name='datasheet'),
-        file_format.format(name='network'),
-        file_format.format(name='wires'),
-        file_format.format(name='connections')
+        instance.biography.stimulus,
+        instance.biography.response
     )
 
-    # save sensor/motor states during the simulation
-    with open(file_format.format(name='stimulus'), 'w') as file:
-        json.dump(instance.biography.stimulus, file)
-    with open(file_format.format(name='response'), 'w') as file:
-        json.dump(instance.biography.response, file)
+    if index is not None:
+        archive.register(dirname(path), dict(
+            index=index,
+            archive=basename(path),
+            density=density(cortex),
+            load=pyramid.sensitivity,
+            seed=cortex.datasheet.seed,
+            fitness=instance.fitness
+        ))
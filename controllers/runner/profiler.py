@@ -0,0 +1,123 @@
+import json
+import logging
+import numpy as np
+import os
+import time
+
+from typing import Dict, List, Optional
+
+# number of timings kept (the older ones are overwritten)
+CAPACITY = 1 << 16
+
+# percentiles of the phases durations reported in the log
+PERCENTILES = (50, 90, 99)
+
+
+class Profiler:
+    """
+    Opt-in timer of the phases of the control steps (e.g., the webots step, the
+    sensors reading, the network stimulation). Each timing is stored in a ring
+    buffer, so that the cost of a measure is just the reading of the clock; if
+    the profiler is disabled, nothing is measured. The durations are summarized
+    in the log (see 'report') and the buffer can be saved as a Chrome trace
+    (see 'dump'), to be inspected in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self):
+        self.enabled, self.trace_file = False, None
+        self.phases: List[str] = list()
+        self.indexes: Dict[str, int] = dict()
+        self.count, self.reported = 0, 0
+
+        # phase index, start and duration (nanoseconds) of each timing
+        self.timings = np.zeros((0, 3), dtype=np.int64)
+
+    def clock(self) -> int:
+        """Get the current time (nanoseconds), if enabled."""
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def record(self, phase: str, start: int) -> int:
+        """
+        Record the duration of a phase started at the given time, if enabled.
+        Return the current time, that is the start of the following phase.
+        """
+
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+
+        if phase not in self.indexes:
+            self.indexes[phase] = len(self.phases)
+            self.phases.append(phase)
+        self.timings[self.count % len(self.timings)] = (
+            self.indexes[phase], start, now - start
+        )
+        self.count += 1
+        return now
+
+    def recent(self, count: int) -> np.ndarray:
+        """Get the last timings recorded (at most the capacity)."""
+
+        count = min(count, self.count, len(self.timings))
+        indexes = np.arange(self.count - count, self.count) % len(self.timings)
+        return self.timings[indexes]
+
+    def report(self, logger: logging.Logger):
+        """
+        Log the percentiles of the durations of each phase (milliseconds)
+        recorded since the last report (e.g., in the last epoch).
+        """
+
+        if not self.enabled or self.count == self.reported:
+            return
+        timings = self.recent(self.count - self.reported)
+        self.reported = self.count
+
+        summary = list()
+        for index, phase in enumerate(self.phases):
+            durations = timings[timings[:, 0] == index, 2] / 1e6
+            if not len(durations):
+                continue
+            values = np.percentile(durations, PERCENTILES)
+            values = ' '.join(
+                f'p{p} {v:.3f}' for p, v in zip(PERCENTILES, values)
+            )
+            summary.append(f'{phase} [{values} total {durations.sum():.1f}]')
+        logger.info('phases timing (ms): ' + ', '.join(summary))
+
+    def dump(self, trace_file: Optional[str] = None):
+        """
+        Save the recorded timings (the ones still in the buffer) in the trace
+        file, in the Chrome trace event format.
+        """
+
+        trace_file = trace_file or self.trace_file
+        if not self.enabled or not trace_file:
+            return
+
+        events = [
+            dict(
+                name=self.phases[phase], ph='X', pid=os.getpid(), tid=0,
+                ts=start / 1e3, dur=duration / 1e3
+            )
+            for phase, start, duration in self.recent(self.count).tolist()
+        ]
+        with open(trace_file, 'w') as file:
+            json.dump(dict(traceEvents=events, displayTimeUnit='ms'), file)
+
+
+def setup(
+        instance: Profiler,
+        trace_file: Optional[str] = None,
+        capacity: int = CAPACITY
+):
+    """
+    Enable the profiler, setting the file where to dump its trace and the number
+    of timings it keeps.
+    """
+
+    instance.enabled, instance.trace_file = True, trace_file
+    instance.timings = np.zeros((capacity, 3), dtype=np.int64)
+
+
+profiler = Profiler()
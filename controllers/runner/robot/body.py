@@ -1,8 +1,9 @@
 from controller import Supervisor
-from robot.component import sensor, enable
+from robot.component import attach, enable, read_all, sensor, Sensor
 from robot.component.motor import Motor
 from utils import Frequency
-from typing import Iterable
+from typing import Dict, Iterable
+from world.manager import Manager
 
 
 class EPuck(Supervisor):
@@ -16,15 +17,42 @@ class EPuck(Supervisor):
     # update/working time for robot modules
     run_frequency = Frequency(hz_value=10)
 
-    # names of actuators (motors) actually used and their connection load
-    motors = tuple([Motor(f'{side} wheel motor') for side in ['left', 'right']])
-
-    def __init__(self, sensors: Iterable[str]):
+    def __init__(self, sensors: Iterable[str], robot_name: str = 'evolvable'):
         Supervisor.__init__(self)
 
         # initialize (existing) sensors and keep 'successful' ones
         self.sensors = tuple(filter(enable(self), map(sensor, sensors)))
 
-        # initialize motors
+        # names of actuators (motors) actually used, bound to their devices
+        sides = ['left', 'right']
+        motors = [Motor(f'{side} wheel motor') for side in sides]
+        self.motors = tuple(map(attach(self), motors))
+
+        # initial poses of the robot and of the objects (see 'restore')
+        self.world = Manager(self, robot_name)
+        for name in self.world.objects():
+            self.world.save(name)
+
+    def restore(self):
+        """
+        Restore the poses of the robot and of the objects of the world to their
+        initial ones, stopping them. Differently from a reset of the simulation,
+        the world is not reloaded: just the saved fields are written. A step is
+        spent to apply them before the robot senses the world again.
+        """
+
         for motor in self.motors:
-            motor.robot = self
+            motor.device.setVelocity(0.0)
+        self.world.restore()
+        self.step(self.run_frequency.ms)
+
+    def simulationReset(self):
+        """Reset the world, keeping the motors in velocity control mode."""
+
+        Supervisor.simulationReset(self)
+        for motor in self.motors:
+            motor.device.setPosition(float('inf'))
+
+    def read_all(self) -> Dict[Sensor, float]:
+        """Read all the sensors at once, normalizing their values."""
+        return read_all(self.sensors)
@@ -0,0 +1,509 @@
+import numpy as np
+
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from nanowire_network_simulator.model.device import Datasheet
+from networkx import Graph
+from scipy.sparse import block_diag, csc_matrix, csr_matrix
+from scipy.sparse.linalg import SuperLU, spsolve, splu
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# number of pins configurations whose system is kept for each circuit
+SYSTEMS_CACHE_SIZE = 4
+
+# number of circuits groups whose batch is kept
+BATCHES_CACHE_SIZE = 2
+
+# maximum refinement steps before giving up, steps after which the factors are
+# considered outdated and refreshed, and accepted residual
+REFINEMENT_STEPS = 12
+REFRESH_STEPS = 6
+RELATIVE_TOLERANCE = 1e-10
+ABSOLUTE_TOLERANCE = 1e-12
+
+
+class Mode(Enum):
+    """Strategies available to solve the nodal analysis of the circuit."""
+
+    # order and factorize the whole system at each stimulation
+    DIRECT = 0
+
+    # reuse the fill-reducing ordering, only the numeric factorization is redone
+    FACTORIZED = 1
+
+    # refine the previous voltages through a conjugate gradient preconditioned
+    # by the last factors, refactorize when they become outdated
+    REFINED = 2
+
+
+@dataclass
+class System:
+    """
+    Nodal analysis system of a circuit for a given set of pins (sources, grounds
+    and loads). It contains the symbolic part of the problem: the free nodes in
+    their fill-reducing order, the sparsity pattern of the reduced conductance
+    matrix and the maps from the junctions conductances to its entries. The
+    last numeric factorization is kept to warm-start the following solutions.
+    """
+
+    # free (unknown) nodes positions, in elimination order
+    free: np.ndarray
+
+    # reduced matrix (filled at each solution) and junction -> entry mapping
+    matrix: csc_matrix
+    entries: np.ndarray
+    junctions: np.ndarray
+    signs: np.ndarray
+    loads: np.ndarray
+
+    # free-node/junction/fixed-node triplets coupling the known voltages
+    coupled_rows: np.ndarray
+    coupled_junctions: np.ndarray
+    coupled_nodes: np.ndarray
+
+    # last numeric factorization of the system
+    factor: Optional[SuperLU] = None
+
+
+@dataclass(frozen=True)
+class Circuit:
+    """
+    Array based representation of the cortex device. The topology is stored as
+    a sparse (CSR) edge-node incidence matrix, while the state of the device is
+    kept in flat NumPy vectors: the memristive state 'g' and the conductance 'Y'
+    of each junction and the voltage 'V' of each node. The vectors are updated
+    in place at each stimulation, making the circuit the authoritative state of
+    the device until it is materialized back into the graph.
+    """
+
+    # network nodes labels and their position in the state vectors
+    nodes: np.ndarray
+    index: Dict[int, int]
+
+    # edges as (head, tail) nodes positions and the related incidence matrix
+    edges: np.ndarray
+    incidence: csr_matrix
+
+    # state of the junctions (edges) and of the nodes
+    g: np.ndarray
+    Y: np.ndarray
+    V: np.ndarray
+
+    # solution strategy and cached systems, by pins configuration
+    mode: Mode = Mode.FACTORIZED
+    systems: Dict[Tuple, System] = field(default_factory=dict, repr=False)
+
+
+def from_graph(graph: Graph, mode: Mode = Mode.FACTORIZED) -> Circuit:
+    """Build the circuit representing the given (initialized) network."""
+
+    nodes = np.array(list(graph.nodes))
+    index = {node: position for position, node in enumerate(nodes.tolist())}
+    edges = np.array(
+        [(index[a], index[b]) for a, b in graph.edges], dtype=np.int64
+    ).reshape(-1, 2)
+
+    # each row of the incidence matrix has +1 in the head and -1 in the tail
+    rows = np.repeat(np.arange(len(edges)), 2)
+    signs = np.tile([1.0, -1.0], len(edges))
+    incidence = csr_matrix(
+        (signs, (rows, edges.ravel())), shape=(len(edges), len(nodes))
+    )
+
+    def edges_attribute(key: str) -> np.ndarray:
+        return np.array([graph[a][b][key] for a, b in graph.edges], dtype=float)
+
+    return Circuit(
+        nodes, index, edges, incidence,
+        edges_attribute('g'),
+        edges_attribute('Y'),
+        np.array([graph.nodes[n].get('V', 0.0) for n in graph.nodes], float),
+        mode
+    )
+
+
+def stimulate(
+        instance: Circuit,
+        datasheet: Datasheet,
+        delta_time: float,
+        inputs: Iterable[Tuple[int, float]],
+        loads: Iterable[Tuple[int, float]],
+        grounds: Set[int]
+):
+    """
+    Stimulate the circuit for 'delta_time' seconds. It follows the same model of
+    the simulator: the junctions evolve according to the voltage drop of the
+    previous step, then the nodes voltages are obtained through a nodal analysis
+    with the inputs as voltage sources and the loads connected to the ground.
+    """
+
+    update_junctions(instance, datasheet, delta_time)
+
+    # sources and grounds have known voltages; all the other nodes are unknown
+    sources = dict((instance.index[n], v) for n, v in inputs)
+    sources.update((instance.index[n], 0.0) for n in grounds)
+    loads = [(instance.index[n], 1.0 / r) for n, r in loads if r > 0]
+    loads = [(pin, y) for pin, y in loads if pin not in sources]
+
+    fixed = np.fromiter(sources.keys(), dtype=np.int64, count=len(sources))
+    instance.V[fixed] = np.fromiter(sources.values(), float, len(sources))
+    if len(fixed) == len(instance.nodes):
+        return
+
+    # without sources, grounds nor loads, the system is singular: relax to 0V
+    if not len(fixed) and not loads:
+        instance.V[:] = 0.0
+        return
+
+    # nodal analysis: (A' * diag(Y) * A + diag(loads)) * V = 0 on free nodes
+    if instance.mode == Mode.DIRECT:
+        free = np.setdiff1d(np.arange(len(instance.nodes)), fixed)
+        laplacian = laplacian_matrix(instance, loads)
+        reduced = laplacian[free][:, free]
+        rhs = -(laplacian[free][:, fixed] @ instance.V[fixed])
+        instance.V[free] = spsolve(reduced.tocsc(), rhs)
+        return
+
+    system = cached_system(instance, fixed, loads)
+    matrix, rhs = assemble(instance, system)
+
+    # warm-start from the previous voltages, refactorizing only if needed
+    solution, steps = None, 0
+    if instance.mode == Mode.REFINED and system.factor is not None:
+        guess = instance.V[system.free]
+        solution, steps = refine(system.factor, matrix, rhs, guess)
+    if solution is None or steps > REFRESH_STEPS:
+        system.factor = factorize(matrix)
+    if solution is None:
+        solution = system.factor.solve(rhs)
+
+    instance.V[system.free] = solution
+
+
+def cached_system(
+        instance: Circuit,
+        fixed: np.ndarray,
+        loads: Iterable[Tuple[int, float]]
+) -> System:
+    """Return the system of the given pins, building it on the first use."""
+
+    key = tuple(fixed.tolist()), tuple(loads)
+    if key not in instance.systems:
+        if len(instance.systems) >= SYSTEMS_CACHE_SIZE:
+            del instance.systems[next(iter(instance.systems))]
+        instance.systems[key] = new_system(instance, fixed, loads)
+    return instance.systems[key]
+
+
+def new_system(
+        instance: Circuit,
+        fixed: np.ndarray,
+        loads: Iterable[Tuple[int, float]]
+) -> System:
+    """Perform the symbolic analysis of the circuit for the given pins."""
+
+    size = len(instance.nodes)
+    free = np.setdiff1d(np.arange(size), fixed)
+    junctions = np.arange(len(instance.edges))
+
+    def entries(position: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """List the (row, column, junction, sign) entries of the matrix."""
+
+        heads, tails = position[instance.edges.T]
+        h, t = heads >= 0, tails >= 0
+        both = h & t
+        rows = [heads[h], tails[t], heads[both], tails[both]]
+        columns = [heads[h], tails[t], tails[both], heads[both]]
+        edges = [junctions[h], junctions[t], junctions[both], junctions[both]]
+        signs = [np.full(len(e), s) for e, s in zip(edges, [1, 1, -1, -1])]
+        return tuple(map(np.concatenate, [rows, columns, edges, signs]))
+
+    # compute the fill-reducing ordering once, on the actual matrix
+    position = np.full(size, -1)
+    position[free] = np.arange(len(free))
+    rows, columns, edges, signs = entries(position)
+    pins = position[[pin for pin, _ in loads]].astype(np.int64)
+    conductances = np.array([conductance for _, conductance in loads], float)
+    matrix = csc_matrix(
+        (
+            np.concatenate([signs * instance.Y[edges], conductances]),
+            (np.concatenate([rows, pins]), np.concatenate([columns, pins]))
+        ),
+        shape=(len(free), len(free))
+    )
+    order = np.argsort(factorize(matrix, 'MMD_AT_PLUS_A').perm_c)
+
+    # number free nodes by elimination order and map the entries to CSC data
+    free = free[order]
+    position[free] = np.arange(len(free))
+    rows, columns, edges, signs = entries(position)
+    pins = position[[pin for pin, _ in loads]].astype(np.int64)
+    keys = np.concatenate([columns, pins]) * len(free)
+    keys += np.concatenate([rows, pins])
+    unique, inverse = np.unique(keys, return_inverse=True)
+    indptr = np.searchsorted(unique // len(free), np.arange(len(free) + 1))
+    matrix = csc_matrix(
+        (np.zeros(len(unique)), unique % len(free), indptr),
+        shape=(len(free), len(free))
+    )
+
+    # free nodes connected to a source or ground receive a known current
+    heads, tails = instance.edges.T
+    to_fixed = (position[heads] >= 0) & (position[tails] < 0)
+    from_fixed = (position[heads] < 0) & (position[tails] >= 0)
+    coupled = np.concatenate([heads[to_fixed], tails[from_fixed]])
+
+    return System(
+        free, matrix,
+        inverse[:len(edges)], edges, signs.astype(float),
+        np.bincount(
+            inverse[len(edges):], weights=conductances, minlength=len(unique)
+        ),
+        position[coupled],
+        np.concatenate([junctions[to_fixed], junctions[from_fixed]]),
+        np.concatenate([tails[to_fixed], heads[from_fixed]])
+    )
+
+
+def assemble(
+        instance: Circuit,
+        system: System
+) -> Tuple[csc_matrix, np.ndarray]:
+    """Fill the system with the actual conductances and known voltages."""
+
+    system.matrix.data[:] = system.loads + np.bincount(
+        system.entries,
+        weights=system.signs * instance.Y[system.junctions],
+        minlength=len(system.loads)
+    )
+
+    currents = instance.Y[system.coupled_junctions]
+    currents = currents * instance.V[system.coupled_nodes]
+    rhs = np.bincount(
+        system.coupled_rows, weights=currents, minlength=len(system.free)
+    )
+
+    return system.matrix, rhs
+
+
+def factorize(matrix: csc_matrix, ordering: str = 'NATURAL') -> SuperLU:
+    """Factorize the symmetric positive definite matrix of the system."""
+
+    return splu(
+        matrix, permc_spec=ordering, diag_pivot_thresh=0.0,
+        options=dict(SymmetricMode=True)
+    )
+
+
+def refine(
+        factor: SuperLU,
+        matrix: csc_matrix,
+        rhs: np.ndarray,
+        guess: np.ndarray
+) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Refine the guess through a conjugate gradient preconditioned with a
+    (possibly outdated) factorization of the matrix. Return the solution and
+    the steps taken, or None if it does not converge in few steps.
+    """
+
+    tolerance = RELATIVE_TOLERANCE * np.linalg.norm(rhs) + ABSOLUTE_TOLERANCE
+    residual = rhs - matrix @ guess
+    if np.linalg.norm(residual) <= tolerance:
+        return guess, 0
+
+    preconditioned = factor.solve(residual)
+    direction, energy = preconditioned, residual @ preconditioned
+
+    for step in range(1, REFINEMENT_STEPS + 1):
+        product = matrix @ direction
+        alpha = energy / (direction @ product)
+        guess = guess + alpha * direction
+        residual = residual - alpha * product
+        if np.linalg.norm(residual) <= tolerance:
+            return guess, step
+
+        preconditioned = factor.solve(residual)
+        energy, previous = residual @ preconditioned, energy
+        direction = preconditioned + energy / previous * direction
+
+    return None, REFINEMENT_STEPS
+
+
+def update_junctions(
+        instance: Circuit,
+        datasheet: Datasheet,
+        delta_time: float
+):
+    """
+    Evolve the memristive state of the junctions for 'delta_time' seconds. The
+    model parameters can also be given junction by junction (see Junctions).
+    """
+
+    delta = np.abs(instance.incidence @ instance.V)
+    kp = datasheet.kp0 * np.exp(datasheet.eta_p * delta)
+    kd = datasheet.kd0 * np.exp(-datasheet.eta_d * delta)
+    k = kp + kd
+
+    decay = np.exp(-k * delta_time)
+    instance.g[:] = kp / k * (1 + (k / kp * instance.g - 1) * decay)
+
+    y_min, y_max = datasheet.Y_min, datasheet.Y_max
+    instance.Y[:] = y_min * (1 - instance.g) + y_max * instance.g
+
+
+def laplacian_matrix(
+        instance: Circuit,
+        loads: Iterable[Tuple[int, float]] = ()
+) -> csr_matrix:
+    """Return the conductance (laplacian) matrix with the loads to ground."""
+
+    heads, tails = instance.edges[:, 0], instance.edges[:, 1]
+    rows = np.concatenate([heads, tails, heads, tails])
+    columns = np.concatenate([heads, tails, tails, heads])
+    values = np.concatenate([instance.Y, instance.Y, -instance.Y, -instance.Y])
+
+    if loads := list(loads):
+        pins, conductances = zip(*loads)
+        rows = np.concatenate([rows, pins])
+        columns = np.concatenate([columns, pins])
+        values = np.concatenate([values, conductances])
+
+    size = len(instance.nodes)
+    return csr_matrix((values, (rows, columns)), shape=(size, size))
+
+
+@dataclass(frozen=True)
+class Junctions:
+    """Memristive model parameters, junction by junction."""
+
+    kp0: np.ndarray
+    eta_p: np.ndarray
+    kd0: np.ndarray
+    eta_d: np.ndarray
+    Y_min: np.ndarray
+    Y_max: np.ndarray
+
+
+@dataclass(frozen=True)
+class Batch:
+    """
+    Group of circuits stimulated together. The circuits are merged in a single
+    block-diagonal union whose nodes and junctions are the concatenation of the
+    circuits ones: a single nodal analysis then solves all of them at once.
+    """
+
+    circuits: Tuple[Circuit, ...]
+    union: Circuit
+    junctions: Junctions
+
+    # first node and junction of each circuit in the union
+    nodes_offsets: np.ndarray
+    edges_offsets: np.ndarray
+
+
+# last created batches, by circuits identity
+batches: Dict[Tuple[int, ...], Batch] = dict()
+
+
+def batch(
+        circuits: Sequence[Circuit],
+        datasheets: Sequence[Datasheet]
+) -> Batch:
+    """Return the batch of the given circuits, building it on the first use."""
+
+    key = tuple(map(id, circuits))
+    if key in batches:
+        return batches[key]
+    if len(batches) >= BATCHES_CACHE_SIZE:
+        del batches[next(iter(batches))]
+
+    nodes = np.cumsum([0] + [len(_.nodes) for _ in circuits])
+    edges = np.cumsum([0] + [len(_.edges) for _ in circuits])
+
+    def concatenate(key: str) -> np.ndarray:
+        return np.concatenate([getattr(_, key) for _ in circuits])
+
+    def parameter(key: str) -> np.ndarray:
+        values = [getattr(_, key) for _ in datasheets]
+        return np.repeat(np.array(values, float), np.diff(edges))
+
+    union = Circuit(
+        np.arange(nodes[-1]),
+        dict((_, _) for _ in range(nodes[-1])),
+        np.concatenate([c.edges + o for c, o in zip(circuits, nodes)]),
+        csr_matrix(block_diag([_.incidence for _ in circuits], format='csr')),
+        concatenate('g'), concatenate('Y'), concatenate('V')
+    )
+    junctions = Junctions(*map(parameter, Junctions.__annotations__))
+
+    batches[key] = Batch(tuple(circuits), union, junctions, nodes, edges)
+    return batches[key]
+
+
+def stimulate_batch(
+        instance: Batch,
+        delta_time: float,
+        inputs: Sequence[Iterable[Tuple[int, float]]],
+        loads: Sequence[Iterable[Tuple[int, float]]]
+):
+    """
+    Stimulate all the circuits of the batch for 'delta_time' seconds, each with
+    its own inputs and loads. It is equivalent to stimulate them one by one.
+    """
+
+    circuits, union = instance.circuits, instance.union
+    offsets = list(zip(circuits, instance.nodes_offsets))
+
+    # gather the actual state of the circuits, that may have changed outside
+    for key in ['g', 'Y', 'V']:
+        state = [getattr(_, key) for _ in circuits]
+        np.concatenate(state, out=getattr(union, key))
+
+    def shift(pins: Sequence[Iterable]) -> List[Tuple[int, float]]:
+        """Move the (node, value) pairs of each circuit to the union nodes."""
+        return [
+            (int(offset + circuit.index[node]), value)
+            for (circuit, offset), pairs in zip(offsets, pins)
+            for node, value in pairs
+        ]
+
+    stimulate(
+        union, instance.junctions, delta_time,
+        shift(inputs), shift(loads), set()
+    )
+
+    # scatter the new state back to the circuits
+    nodes, edges = instance.nodes_offsets, instance.edges_offsets
+    for index, circuit in enumerate(circuits):
+        junctions = slice(edges[index], edges[index + 1])
+        circuit.g[:], circuit.Y[:] = union.g[junctions], union.Y[junctions]
+        circuit.V[:] = union.V[nodes[index]:nodes[index + 1]]
+
+
+def voltage(instance: Circuit, node: int) -> float:
+    """Return the voltage of the given network node."""
+
+    return float(instance.V[instance.index[node]])
+
+
+def clone(instance: Circuit) -> Circuit:
+    """
+    Return a circuit with a copy of the state of the given one. The topology and
+    the cached systems, which do not depend on the state, are shared.
+    """
+
+    return replace(
+        instance, g=instance.g.copy(), Y=instance.Y.copy(), V=instance.V.copy()
+    )
+
+
+def materialize(instance: Circuit, graph: Graph) -> Graph:
+    """Write the circuit state back into the attributes of the graph."""
+
+    delta = np.abs(instance.incidence @ instance.V)
+    for (a, b), g, y, dv in zip(graph.edges, instance.g, instance.Y, delta):
+        graph[a][b].update(g=float(g), Y=float(y), deltaV=float(dv))
+    for node, v in zip(instance.nodes.tolist(), instance.V):
+        graph.nodes[node]['V'] = float(v)
+    return graph
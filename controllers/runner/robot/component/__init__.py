@@ -1,8 +1,12 @@
-from controller import Robot
 from .ground import GroundSensor
 from .infrared import IRSensor
+from .motor import Motor
 from .sensor import Sensor
-from typing import Iterable, Callable
+from typing import TYPE_CHECKING, Callable, Dict, Iterable
+
+# webots is needed just by the real body (not by the surrogate)
+if TYPE_CHECKING:
+    from controller import Robot
 
 
 def sensor(name: str) -> Sensor:
@@ -10,9 +14,13 @@ def sensor(name: str) -> Sensor:
     return IRSensor(name) if name.startswith('ps') else GroundSensor(name)
 
 
-def enable(robot: Robot) -> Callable[[Sensor], bool]:
+def enable(robot: 'Robot') -> Callable[[Sensor], bool]:
+    """
+    Get a function binding a sensor to its device in the robot (resolved just
+    once) and enabling it. It returns whether the sensor exists.
+    """
     def _(target: Sensor) -> bool:
-        target.robot = robot
+        target.robot, target.device = robot, robot.getDevice(target)
         if not target.exists():
             return False
         target.enable()
@@ -20,6 +28,23 @@ def enable(robot: Robot) -> Callable[[Sensor], bool]:
     return _
 
 
+def attach(robot: 'Robot') -> Callable[[Motor], Motor]:
+    """
+    Get a function binding a motor to its device in the robot (resolved just
+    once) and setting it in velocity control mode.
+    """
+    def _(target: Motor) -> Motor:
+        target.robot, target.device = robot, robot.getDevice(target)
+        target.device.setPosition(float('inf'))
+        return target
+    return _
+
+
+def read_all(sensors: Iterable[Sensor]) -> Dict[Sensor, float]:
+    """Read all the sensors, normalizing their values."""
+    return {_: _.read(normalize=True) for _ in sensors}
+
+
 def irs(sensors: Iterable[Sensor]) -> Iterable[IRSensor]:
     """Filter IR sensors and return them."""
     return [_ for _ in sensors if isinstance(_, IRSensor)]
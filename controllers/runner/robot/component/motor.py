@@ -1,12 +1,15 @@
-from controller import Robot
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from controller import Device, Robot
 
 
 class Motor(str):
     """Represents a robot motor"""
 
-    # the robot that it is working for/in
-    robot: Robot
+    # the robot that it is working for/in and its device (see 'attach')
+    robot: 'Robot'
+    device: 'Device'
 
     @staticmethod
     def range(reverse: bool = False) -> Tuple[float, float]:
@@ -16,10 +19,9 @@ class Motor(str):
     @property
     def speed(self) -> float:
         """Return motor actual running speed."""
-        return self.robot.getDevice(self).getVelocity()
+        return self.device.getVelocity()
 
     @speed.setter
     def speed(self, value: float):
         """Set motor running speed."""
-        self.robot.getDevice(self).setPosition(float('inf'))
-        self.robot.getDevice(self).setVelocity(value)
+        self.device.setVelocity(value)
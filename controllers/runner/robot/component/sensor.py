@@ -1,7 +1,9 @@
 from abc import abstractmethod
-from controller import Robot
-from typing import Tuple
-from utils import adapt
+from typing import TYPE_CHECKING, Tuple
+from utils import mapper
+
+if TYPE_CHECKING:
+    from controller import Device, Robot
 
 
 class Sensor(str):
@@ -10,8 +12,9 @@ class Sensor(str):
     methods.
     """
 
-    # the robot that it is part of
-    robot: Robot
+    # the robot that it is part of and its device (resolved once, see 'enable')
+    robot: 'Robot'
+    device: 'Device'
 
     @abstractmethod
     def range(self) -> Tuple[float, float]:
@@ -21,15 +24,15 @@ class Sensor(str):
     def read(self, normalize: bool = False) -> float:
         """Returns the sensor reading."""
 
-        value = self.robot.getDevice(self).getValue()
-        return adapt(value, self.range()) if normalize else value
+        value = self.device.getValue()
+        return mapper(self.range())(value) if normalize else value
 
     def enable(self, update_frequency: int = 1):
         """Enable the sensors to perceive information at the given frequency."""
 
-        self.robot.getDevice(self).enable(update_frequency)
+        self.device.enable(update_frequency)
 
     def exists(self) -> bool:
         """Check if the given device is available on the given robot."""
 
-        return self.robot.getDevice(self) is not None
+        return self.device is not None
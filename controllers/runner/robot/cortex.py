@@ -1,10 +1,13 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from nanowire_network_simulator import minimum_viable_network
 from nanowire_network_simulator import initialize_graph_attributes
+from nanowire_network_simulator import stimulate as stimulate_graph
 from nanowire_network_simulator import voltage_initialization
 from nanowire_network_simulator.model.device import Datasheet
 from networkx import Graph
-from typing import Dict, Tuple
+from robot import circuit
+from robot.circuit import Circuit, Mode
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
 
 
 @dataclass(frozen=True)
@@ -24,22 +27,121 @@ class Cortex:
     # accepted stimulus range of the network
     working_range: Tuple[float, float] = (0.0, 10.0)
 
+    # sparse representation of the device. When present, it holds the state of
+    # the device and the attributes of the graph are only updated on request
+    circuit: Optional[Circuit] = field(default=None, compare=False, repr=False)
 
-def new(datasheet: Datasheet) -> Cortex:
+
+def new(datasheet: Datasheet, sparse: bool = False) -> Cortex:
     """Get a device represented by the given datasheet and initialize it."""
 
     graph, wires = minimum_viable_network(datasheet)
     initialize_graph_attributes(graph, set(), set(), datasheet.Y_min)
     voltage_initialization(graph, {next(iter(graph.nodes))}, set())
-    return Cortex(graph, datasheet, wires)
+    instance = Cortex(graph, datasheet, wires)
+    return to_sparse(instance) if sparse else instance
+
+
+def to_sparse(instance: Cortex, mode: Mode = Mode.FACTORIZED) -> Cortex:
+    """
+    Return the cortex backed by the sparse representation of its device. The
+    mode defines how the circuit solves the network at each stimulation.
+    """
+
+    if instance.circuit is not None:
+        return instance
+    return replace(instance, circuit=circuit.from_graph(instance.network, mode))
+
+
+def stimulate(
+        instance: Cortex,
+        delta_time: float,
+        inputs: Iterable[Tuple[int, float]],
+        loads: Iterable[Tuple[int, float]],
+        grounds: Set[int] = frozenset()
+):
+    """Stimulate the device with the given inputs, whatever its backend."""
+
+    if instance.circuit is None:
+        stimulate_graph(
+            instance.network, instance.datasheet, delta_time,
+            list(inputs), list(loads), set(grounds)
+        )
+    else:
+        circuit.stimulate(
+            instance.circuit, instance.datasheet, delta_time,
+            inputs, loads, grounds
+        )
+
+
+def stimulate_batch(
+        instances: Sequence[Cortex],
+        delta_time: float,
+        inputs: Sequence[Iterable[Tuple[int, float]]],
+        loads: Sequence[Iterable[Tuple[int, float]]]
+):
+    """
+    Stimulate several sparse cortices at once, each with its inputs and loads.
+    The devices are solved together as a single block-diagonal circuit.
+    """
+
+    if any(_.circuit is None for _ in instances):
+        raise ValueError('Batched stimulation requires sparse cortices')
+
+    group = circuit.batch(
+        [_.circuit for _ in instances],
+        [_.datasheet for _ in instances]
+    )
+    circuit.stimulate_batch(group, delta_time, inputs, loads)
+
+
+def voltage(instance: Cortex, node: int) -> float:
+    """Return the actual voltage of the given node of the device."""
+
+    if instance.circuit is None:
+        return instance.network.nodes[node]['V']
+    return circuit.voltage(instance.circuit, node)
+
+
+def clone(instance: Cortex) -> Cortex:
+    """
+    Return a cortex with a copy of the device state, that can be stimulated
+    without affecting the original one.
+    """
+
+    if instance.circuit is None:
+        return replace(instance, network=instance.network.copy())
+    return replace(instance, circuit=circuit.clone(instance.circuit))
+
+
+def synchronize(instance: Cortex) -> Graph:
+    """
+    Return the network graph with its attributes up to date. It is needed only
+    by sparse cortices, before saving or plotting the network.
+    """
+
+    if instance.circuit is None:
+        return instance.network
+    return circuit.materialize(instance.circuit, instance.network)
+
+
+def density(instance: Cortex) -> float:
+    """Return the nano-wires density of the device."""
+
+    data = instance.datasheet
+    return data.wires_count * data.mean_length ** 2 / (data.Lx * data.Ly)
+
+
+def connected_density(instance: Cortex) -> float:
+    """Return the density of the connected component used as device."""
+
+    data = instance.datasheet
+    nodes = instance.network.number_of_nodes()
+    return nodes * data.mean_length ** 2 / (data.Lx * data.Ly)
 
 
 def describe(instance: Cortex):
     """Return a custom string representation of the object."""
 
-    graph, data = instance.network, instance.datasheet
-    area = data.Lx * data.Ly
-    d = data.wires_count * data.mean_length ** 2 / area
-    cc_d = graph.number_of_nodes() * data.mean_length ** 2 / area
-
+    d, cc_d = density(instance), connected_density(instance)
     return str(f'Device density: {d}, Connected component density: {cc_d}')
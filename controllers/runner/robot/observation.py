@@ -0,0 +1,62 @@
+import numpy as np
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional
+from utils import mapper
+
+# webots is needed just to observe the real body
+if TYPE_CHECKING:
+    from robot.body import EPuck
+
+
+@dataclass(frozen=True)
+class Observation:
+    """
+    Snapshot of the robot at a step: the readings of its sensors, taken once
+    after the world has been stepped, and the velocities of its motors, as set
+    by the controller. It also contains the signals exchanged with the network
+    (the stimulus and the response). Whoever needs the state of the robot at the
+    step (i.e., the controller, the evaluator and the biography) reads it from
+    here, instead of querying the devices again.
+    """
+
+    # raw and normalized (range [0, 1]) readings of the sensors
+    readings: Dict[str, float]
+    normalized: Dict[str, float]
+
+    # velocities of the motors
+    speeds: Dict[str, float]
+
+    # inputs and outputs of the network, as recorded in the biography
+    stimulus: Dict[str, float] = field(default_factory=dict)
+    response: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Observations:
+    """
+    Observations of the steps of a life, in columnar form: the values of each
+    transducer are an array with a value per step. The positions of the robot
+    (steps x 3) are present only if tracked.
+    """
+
+    readings: Dict[str, np.ndarray]
+    normalized: Dict[str, np.ndarray]
+    speeds: Dict[str, np.ndarray]
+    positions: Optional[np.ndarray] = None
+
+
+def observe(
+        body: 'EPuck',
+        speeds: Optional[Dict[str, float]] = None
+) -> Observation:
+    """
+    Read the sensors of the body, each one just once. If not given, the speeds
+    are read from the motors.
+    """
+
+    readings = {_: _.read() for _ in body.sensors}
+    normalized = {k: mapper(k.range())(v) for k, v in readings.items()}
+    if speeds is None:
+        speeds = {_: _.speed for _ in body.motors}
+    return Observation(readings, normalized, speeds)
@@ -1,13 +1,15 @@
-from dataclasses import dataclass
-from nanowire_network_simulator import stimulate
+from dataclasses import dataclass, replace
 from robot.body import EPuck
-from robot.cortex import Cortex, describe as cortex2str
+from robot.cortex import Cortex, describe as cortex2str, stimulate, voltage
+from robot.cortex import stimulate_batch
 from robot.component.motor import Motor
 from robot.fiber import nodes
+from robot.observation import observe, Observation
+from profiler import profiler
 from robot.pyramid import Pyramid, describe as pyramid2str
 from robot.thalamus import Thalamus, describe as thalamus2str
-from typing import Dict, Tuple
-from utils import adapt
+from typing import Dict, List, Sequence, Tuple
+from utils import mapper
 
 
 @dataclass(frozen=True)
@@ -35,46 +37,132 @@ def unroll(instance: Robot) -> Tuple[EPuck, Cortex, Pyramid, Thalamus]:
     return instance.body, instance.cortex, instance.pyramid, instance.thalamus
 
 
-def run(instance: Robot) -> Tuple[Dict[str, float], Dict[str, float]]:
+def run(instance: Robot) -> Observation:
     """
     Execute a simulation step, stimulating the network with the sensors signals.
-    Evaluate its response and use it to control the motors.
+    Evaluate its response and use it to control the motors. Return the
+    observation of the step, with the signals of the network.
     """
 
     body, cortex, pyramid, thalamus = unroll(instance)
-    network, datasheet = cortex.network, cortex.datasheet
-    sensors, motors = thalamus.mapping, pyramid.mapping
+    tick = profiler.clock()
 
     # webots has stopped/paused the simulation
     if body.step(body.run_frequency.ms) == -1:
-        return dict(), dict()
+        return observe(body)
+    tick = profiler.record('step', tick)
 
-    # get normalized sensors readings (range [0, 1]) and apply multiplier
-    reads = [(s, s.read(normalize=True)) for s in body.sensors]
-    reads = [(k, v * thalamus.multiplier.get(k, 1.0)) for k, v in reads]
-
-    # adapt to range [0-10] and filter non used sensors
-    reads = [(k, adapt(v, out_range=cortex.working_range)) for k, v in reads]
-    reads = [(sensors[k], v) for k, v in reads if k in sensors]
-
-    # define the pin-resistance/load pairs for the motors
-    loads = [(pin, pyramid.sensitivity) for pin in nodes(motors)]
+    # get sensors readings, once for the step, and map them to the nodes
+    observation = observe(body, dict())
+    reads = stimuli(instance, observation.normalized)
+    tick = profiler.record('sense', tick)
 
     # stimulate the network with the sensors inputs
-    stimulate(network, datasheet, body.run_frequency.s, reads, loads, set())
+    stimulate(cortex, body.run_frequency.s, reads, loads(instance))
+    tick = profiler.record('stimulate', tick)
 
-    # extract outputs from network and remap output values from 0, 10 to:
-    #   -6.28, 6.28 for distance: 10 = far -> 6.28 = move straight
-    #   6.28, -6.28 for proximity: 10 = near -> -6.28 = go away
-    outs = [(motor, network.nodes[pin]['V']) for motor, pin in motors.items()]
-    outs = {k: adapt(v, in_range=cortex.working_range) for k, v in outs}
+    # extract outputs from network and use them to control the motors
+    outs = responses(instance)
 
     # set the motors' speed according to its response
-    for motor, value in zip(body.motors, map(outs.get, body.motors)):
-        motor.speed = adapt(value, out_range=Motor.range(reverse=True))
+    speeds = actuate(instance, outs)
+    profiler.record('actuate', tick)
 
     # return data for reference
-    return dict(zip(sensors.keys(), dict(reads).values())), outs
+    return replace(
+        observation,
+        speeds=speeds,
+        stimulus=dict(zip(thalamus.mapping.keys(), dict(reads).values())),
+        response=outs
+    )
+
+
+def run_batch(
+        instances: Sequence[Robot],
+        readings: Sequence[Dict[str, float]]
+) -> List[Tuple[Dict[str, float], Dict[str, float]]]:
+    """
+    Stimulate the networks of several robots with the given normalized sensors
+    readings (range [0, 1]), one dictionary for each robot, and evaluate their
+    responses. The networks are stimulated together in a single step, that
+    requires their cortices to be sparse. Differently from 'run', the bodies are
+    neither stepped nor actuated: the responses are just returned, together
+    with the stimulus of each network.
+    """
+
+    if not instances:
+        return list()
+
+    reads = [*map(stimuli, instances, readings)]
+    stimulate_batch(
+        [_.cortex for _ in instances],
+        next(iter(instances)).body.run_frequency.s,
+        reads, [*map(loads, instances)]
+    )
+
+    return [
+        (dict(zip(i.thalamus.mapping.keys(), dict(r).values())), responses(i))
+        for i, r in zip(instances, reads)
+    ]
+
+
+def stimuli(
+        instance: Robot,
+        readings: Dict[str, float]
+) -> List[Tuple[int, float]]:
+    """
+    Convert the normalized sensors readings (range [0, 1]) to the network
+    inputs, in the form of (node, voltage) pairs.
+    """
+
+    cortex, thalamus = instance.cortex, instance.thalamus
+    sensors, multiplier = thalamus.mapping, thalamus.multiplier
+
+    # apply multiplier to the readings
+    reads = [(k, v * multiplier.get(k, 1.0)) for k, v in readings.items()]
+
+    # adapt to range [0-10] and filter non used sensors
+    to_network = mapper(out_range=cortex.working_range)
+    reads = [(k, to_network(v)) for k, v in reads]
+    return [(sensors[k], v) for k, v in reads if k in sensors]
+
+
+def loads(instance: Robot) -> List[Tuple[int, float]]:
+    """Define the pin-resistance/load pairs for the motors."""
+
+    pyramid = instance.pyramid
+    return [(pin, pyramid.sensitivity) for pin in nodes(pyramid.mapping)]
+
+
+def responses(instance: Robot) -> Dict[str, float]:
+    """
+    Extract outputs from network and remap output values from 0, 10 to 0, 1.
+    Those are then used to control the motors:
+      -6.28, 6.28 for distance: 10 = far -> 6.28 = move straight
+      6.28, -6.28 for proximity: 10 = near -> -6.28 = go away
+    """
+
+    cortex, motors = instance.cortex, instance.pyramid.mapping
+    outs = [(motor, voltage(cortex, pin)) for motor, pin in motors.items()]
+    from_network = mapper(in_range=cortex.working_range)
+    return {k: from_network(v) for k, v in outs}
+
+
+def actuate(instance: Robot, outputs: Dict[str, float]) -> Dict[str, float]:
+    """
+    Set the motors' speed according to the network responses. Return the speeds
+    set to the motors.
+    """
+
+    motors = instance.body.motors
+    to_speed = mapper(out_range=Motor.range(reverse=True))
+    speeds = {
+        motor: to_speed(value)
+        for motor, value in zip(motors, map(outputs.get, motors))
+    }
+    for motor, speed in speeds.items():
+        motor.speed = speed
+    return speeds
 
 
 def describe(robot: Robot) -> str:
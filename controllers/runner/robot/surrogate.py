@@ -0,0 +1,292 @@
+import numpy as np
+
+from robot.component import attach, enable, read_all, sensor, Sensor
+from robot.component.motor import Motor
+from typing import Dict, Iterable, List, Optional
+from utils import Frequency
+from world.arena import Arena
+
+# e-puck geometry (meters)
+BODY_RADIUS = 0.037
+WHEEL_RADIUS = 0.0205
+AXLE_LENGTH = 0.052
+
+# orientation of the proximity sensors from the front (radians, positive on the
+# left) and lookup table from the obstacle distance to their reading
+PROXIMITY_ANGLES = dict(
+    ps0=-0.30, ps1=-0.80, ps2=-1.57, ps3=-2.64,
+    ps4=2.64, ps5=1.57, ps6=0.80, ps7=0.30
+)
+PROXIMITY_DISTANCES = [0.0, .005, .01, .015, .02, .03, .04, .05, .06, .07]
+PROXIMITY_READINGS = [4095, 2133, 1465, 601, 383, 234, 158, 120, 104, 67]
+
+# position of the ground sensors from the center of the robot (forward, left)
+GROUND_OFFSETS = dict(gs0=(0.03, 0.01), gs1=(0.03, 0.0), gs2=(0.03, -0.01))
+
+
+class Device:
+    """Minimal stand-in of a webots sensor or motor device."""
+
+    def __init__(self):
+        self.value, self.velocity = 0.0, 0.0
+
+    def enable(self, _: int): pass
+
+    def getValue(self) -> float: return self.value
+
+    def setPosition(self, _: float): pass
+
+    def getVelocity(self) -> float: return self.velocity
+
+    def setVelocity(self, value: float):
+        self.velocity = max(min(value, Motor.range()[1]), Motor.range()[0])
+
+
+class Field:
+    """Minimal stand-in of a webots field (translation or rotation only)."""
+
+    def __init__(self, values: List[float]):
+        self.values = values
+
+    def getSFVec3f(self) -> List[float]: return list(self.values)
+
+    def setSFVec3f(self, values: List[float]): self.values[:] = values
+
+    getSFRotation, setSFRotation = getSFVec3f, setSFVec3f
+
+
+class Node:
+    """Minimal stand-in of a webots node of the surrogate world."""
+
+    def __init__(self, world: 'Surrogate', index: int):
+        self.world, self.index = world, index
+
+    def getField(self, name: str) -> Optional[Field]:
+        if name == 'translation':
+            return Field(self.world.translations[self.index])
+        if name == 'rotation':
+            return Field(self.world.rotations[self.index])
+        return None
+
+    def getContactPoints(self) -> List[List[float]]:
+        return self.world.contacts(self.index)
+
+    def resetPhysics(self): pass
+
+
+class Surrogate:
+    """
+    Kinematic replacement of the webots e-puck (and of its world), exposing the
+    same interface of the body. It moves with a differential drive in the given
+    arena, ray-casting the proximity sensors against its obstacles and sensing
+    the color of the floors below the ground sensors. It is not meant to be
+    accurate, but to approximate the robot behaviour orders of magnitude faster
+    than webots, without requiring it.
+    """
+
+    # update/working time for robot modules
+    run_frequency = Frequency(hz_value=10)
+
+    def __init__(
+            self,
+            sensors: Iterable[str],
+            arena: Arena,
+            robot_name: str = 'evolvable'
+    ):
+        self.arena, self.time = arena, 0
+        sides = ['left', 'right']
+        motors = [Motor(f'{side} wheel motor') for side in sides]
+
+        # devices of the robot, by name
+        names = [*PROXIMITY_ANGLES, *GROUND_OFFSETS, *motors]
+        self.devices: Dict[str, Device] = {_: Device() for _ in names}
+
+        # named objects of the world: the robot, the obstacles and the floors
+        items = [*arena.obstacles, *arena.floors]
+        self.names = [robot_name, *[_.name for _ in items]]
+        self.extents = np.array([_.extent for _ in arena.obstacles]) / 2.0
+        self.extents = self.extents.reshape(-1, 2)
+        self.translations = [list() for _ in self.names]
+        self.rotations = [list() for _ in self.names]
+        self.simulationReset()
+
+        # initialize (existing) sensors and keep 'successful' ones
+        self.sensors = tuple(filter(enable(self), map(sensor, sensors)))
+
+        # initialize motors
+        self.motors = tuple(map(attach(self), motors))
+
+    def getDevice(self, name: str) -> Optional[Device]:
+        return self.devices.get(name)
+
+    def getFromDef(self, name: str) -> Optional[Node]:
+        if name not in self.names:
+            return None
+        return Node(self, self.names.index(name))
+
+    def getTime(self) -> float: return self.time / 1000.0
+
+    def read_all(self) -> Dict[Sensor, float]:
+        """Read all the sensors at once, normalizing their values."""
+        return read_all(self.sensors)
+
+    def simulationReset(self):
+        """Restore the world to its initial state."""
+
+        items = [*self.arena.obstacles, *self.arena.floors]
+        translations = [self.arena.translation, *[_.translation for _ in items]]
+        rotations = [self.arena.rotation, *[_.rotation for _ in items]]
+
+        # update the fields in place, as they may be referenced by the nodes
+        for current, initial in zip(self.translations, translations):
+            current[:] = initial
+        for current, initial in zip(self.rotations, rotations):
+            current[:] = initial
+        for device in self.devices.values():
+            device.value, device.velocity = 0.0, 0.0
+        self.time = 0
+        self.sense()
+
+    def restore(self):
+        """Restore the world to its initial state (as cheap as a reset)."""
+        self.simulationReset()
+
+    def simulationQuit(self, _: int): pass
+
+    def step(self, duration: int) -> int:
+        """
+        Advance the world of the given milliseconds: move the robot according to
+        the speed of its wheels (if not blocked) and update the sensors.
+        """
+
+        seconds = duration / 1000.0
+        left, right = (
+            self.devices[_].velocity * WHEEL_RADIUS * seconds
+            for _ in self.motors
+        )
+
+        # differential drive: rotate and move along the new heading
+        heading = self.heading() + (right - left) / AXLE_LENGTH
+        position = self.position() + direction(heading) * (left + right) / 2.0
+
+        # the robot stops against the obstacles, but it can still rotate
+        if not self.collides(position):
+            self.translations[0][0], self.translations[0][2] = position
+        self.rotations[0][:] = [0.0, 1.0, 0.0, heading]
+
+        self.time += duration
+        self.sense()
+        return 0
+
+    def sense(self):
+        """Update the sensors readings according to the robot pose."""
+
+        position, heading = self.position(), self.heading()
+
+        # distance of the obstacles along the proximity sensors directions
+        angles = np.array([*PROXIMITY_ANGLES.values()]) + heading
+        distances = self.cast(position, direction(angles)) - BODY_RADIUS
+        readings = np.interp(distances, PROXIMITY_DISTANCES, PROXIMITY_READINGS)
+        for name, value in zip(PROXIMITY_ANGLES, readings):
+            self.devices[name].value = float(value)
+
+        # color of the top floor below the ground sensors
+        forward, left = direction(heading), direction(heading + np.pi / 2)
+        for name, (ahead, aside) in GROUND_OFFSETS.items():
+            point = position + forward * ahead + left * aside
+            self.devices[name].value = self.color(point)
+
+    def cast(self, origin: np.ndarray, rays: np.ndarray) -> np.ndarray:
+        """Get the distance to the nearest obstacle or wall along each ray."""
+
+        rays = np.where(rays == 0.0, 1e-12, rays)[:, None, :]
+
+        # slabs method: distances of the entry and exit of each box, by ray
+        centers = np.array(self.obstacles()).reshape(-1, 2)
+        lower, upper = centers - self.extents, centers + self.extents
+        near, far = slabs(origin, rays, lower, upper)
+        hits = np.where(far >= np.maximum(near, 0.0), near, np.inf)
+        hits = np.where(hits < 0.0, 0.0, hits)
+
+        # the walls are where the rays exit the arena
+        center, size = np.array(self.arena.center), np.array(self.arena.size)
+        _, walls = slabs(origin, rays, center - size / 2, center + size / 2)
+
+        return np.minimum(hits.min(axis=1, initial=np.inf), walls[:, 0])
+
+    def collides(self, position: np.ndarray) -> bool:
+        """Check if the robot, in the given position, hits something."""
+
+        center, size = np.array(self.arena.center), np.array(self.arena.size)
+        if np.any(np.abs(position - center) > size / 2 - BODY_RADIUS):
+            return True
+        centers = np.array(self.obstacles()).reshape(-1, 2)
+        return bool(np.any(overlap(position, centers, self.extents)))
+
+    def contacts(self, index: int) -> List[List[float]]:
+        """Get the contact points of an object (just the touched ones)."""
+
+        if index == 0 and self.collides(self.position()):
+            return [self.translations[0]]
+        if index == 0 or index > len(self.extents):
+            return []
+        center = np.array(self.obstacles()[index - 1])
+        if overlap(self.position(), center[None], self.extents[[index - 1]])[0]:
+            return [self.translations[index]]
+        return []
+
+    def color(self, point: np.ndarray) -> float:
+        """Get the color of the top floor in the given point."""
+
+        floors = self.arena.floors
+        translations = self.translations[1 + len(self.arena.obstacles):]
+        top = None
+        for floor, (x, y, z) in zip(floors, translations):
+            half = np.divide(floor.extent, 2.0)
+            inside = np.all(np.abs(point - [x, z]) <= half)
+            if inside and (top is None or y > top[0]):
+                top = y, floor.color
+        return top[1] if top else self.arena.color
+
+    def obstacles(self) -> List[List[float]]:
+        """Get the positions of the obstacles in the ground plane."""
+
+        obstacles = self.translations[1:][:len(self.arena.obstacles)]
+        return [[x, z] for x, _, z in obstacles]
+
+    def position(self) -> np.ndarray:
+        """Get the position of the robot in the ground plane (x, z)."""
+
+        return np.array(self.translations[0][::2])
+
+    def heading(self) -> float:
+        """Get the rotation of the robot around the vertical axis."""
+
+        _, y, _, angle = self.rotations[0]
+        return angle if y >= 0 else -angle
+
+
+def direction(heading):
+    """
+    Get the planar (x, z) unit vector the robot faces with the given heading.
+    At heading 0 the e-puck faces the negative z axis.
+    """
+
+    heading = np.asarray(heading)
+    return np.stack([-np.sin(heading), -np.cos(heading)], axis=-1)
+
+
+def slabs(origin, rays, lower, upper):
+    """Get the distances at which the rays enter and exit the given boxes."""
+
+    first, second = (lower - origin) / rays, (upper - origin) / rays
+    near = np.minimum(first, second).max(axis=-1)
+    far = np.maximum(first, second).min(axis=-1)
+    return near, far
+
+
+def overlap(position, centers, extents):
+    """Check which boxes are overlapped by the robot in the given position."""
+
+    closest = np.clip(position, centers - extents, centers + extents)
+    return np.hypot(*(closest - position).T) < BODY_RADIUS
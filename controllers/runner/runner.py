@@ -1,22 +1,46 @@
 from config import *
+from dataclasses import replace
+from optimization import archive
+from optimization.metrics import recorder
 from optimization.simulation import optimize
-from optimization.utils import import_simulations, new_simulations, save
+from optimization.utils import discard_checkpoint, save
+from optimization.utils import import_simulations, new_simulations
 
 
+# the simulations already saved by a previous (crashed) run of the process are
+# skipped, without generating or reading their devices (they are registered in
+# the manifest once saved)
+saved = {_['index'] for _ in archive.entries(save_path)}
+
 # import simulations from the 'controllers' folder
-simulations = import_simulations(robot, simulation_settings)
+simulations = import_simulations(
+    robot, simulation_settings, sparse=sparse_cortex, shard=shard,
+    checkpoints=checkpoints_path, skip=saved
+)
 
 # if no simulations have been imported, generate new ones
 if not simulations:
-    simulations = new_simulations(robot, simulation_settings, settings)
+    simulations = new_simulations(
+        robot, simulation_settings, settings, sparse=sparse_cortex, shard=shard,
+        checkpoints=checkpoints_path, cache=cache_path, skip=saved
+    )
 
 
 # run simulations of different devices and save the best scoring configurations
-for index, individual in enumerate(map(optimize, simulations)):
-    file_format = str(save_path) + '/{name}' + f'.{index}.dat'
-    save(individual.elite, file_format)
+# (indexes are the global ones of the simulations, also when running just a
+# shard of them or a selection of the imported ones). The interrupted ones are
+# resumed from their last checkpoint. The metrics of each epoch are streamed to
+# the metrics file of the saving folder
+for simulation in simulations:
+    index = simulation.index
+    path = os.path.join(save_path, f'simulation.{index}{archive.EXTENSION}')
+    simulation = replace(simulation, metrics=recorder(save_path, index))
+    save(optimize(simulation).elite, path, index)
+    discard_checkpoint(checkpoints_path, index)
 
 
 # end of the simulation
+profiler.dump()
+logger.plot_flush()
 logger.info('Simulation complete')
 robot.simulationQuit(0)
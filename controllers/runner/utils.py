@@ -1,25 +1,73 @@
-import operator
+import numpy as np
 
-from dataclasses import dataclass
-from functools import reduce
+from dataclasses import dataclass, field
+from functools import lru_cache
 from math import copysign
-from typing import Tuple
+from typing import Tuple, TypeVar
 
+Value = TypeVar('Value', float, np.ndarray)
 
-def adapt(
-        value: float,
+
+@dataclass(frozen=True)
+class Mapper:
+    """
+    Map the values in a range to a different one, as 'adapt' does. The scale,
+    offset and bounds of the affine map are computed once, at creation. It
+    works on both scalars and numpy arrays (element-wise).
+    """
+
+    in_range: Tuple[float, float] = (0.0, 1.0)
+    out_range: Tuple[float, float] = (0.0, 1.0)
+
+    # parameters of the map: value -> offset + scale * |value - origin|
+    origin: float = field(init=False)
+    offset: float = field(init=False)
+    scale: float = field(init=False)
+
+    # bounds of the mapped values
+    lower: float = field(init=False)
+    upper: float = field(init=False)
+
+    def __post_init__(self):
+        in_delta = self.in_range[1] - self.in_range[0]
+        out_delta = self.out_range[1] - self.out_range[0]
+        parameters = dict(
+            origin=min(self.in_range),
+            offset=self.out_range[0],
+            scale=copysign(out_delta / in_delta, out_delta),
+            lower=min(self.out_range),
+            upper=max(self.out_range)
+        )
+        for name, value in parameters.items():
+            object.__setattr__(self, name, value)
+
+    def __call__(self, value: Value) -> Value:
+        value = self.offset + self.scale * abs(value - self.origin)
+
+        # force bounds to the value and return it
+        if isinstance(value, np.ndarray):
+            return np.clip(value, self.lower, self.upper)
+        return max(min(value, self.upper), self.lower)
+
+
+@lru_cache(maxsize=None)
+def mapper(
         in_range: Tuple[float, float] = (0.0, 1.0),
         out_range: Tuple[float, float] = (0.0, 1.0)
-) -> float:
-    """Adapt a value in a range to a different one."""
+) -> Mapper:
+    """Get the (shared) mapper between the two ranges."""
+
+    return Mapper(in_range, out_range)
 
-    in_delta: float = reduce(operator.__sub__, reversed(in_range))
-    out_delta: float = reduce(operator.__sub__, reversed(out_range))
-    value = (value - min(in_range)) * out_delta / in_delta
-    value = out_range[0] + copysign(value, out_delta)
 
-    # force bounds to the value and return it
-    return max(min(value, max(out_range)), min(out_range))
+def adapt(
+        value: Value,
+        in_range: Tuple[float, float] = (0.0, 1.0),
+        out_range: Tuple[float, float] = (0.0, 1.0)
+) -> Value:
+    """Adapt a value (or an array of values) in a range to a different one."""
+
+    return mapper(tuple(in_range), tuple(out_range))(value)
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,130 @@
+import re
+
+from dataclasses import dataclass
+from math import cos, sin
+from typing import List, Optional, Tuple
+from world.colors import Colors
+
+# webots' default sizes of the arena floor and of the proto objects
+DEFAULT_FLOOR_SIZE = (1.0, 1.0)
+DEFAULT_SOLID_SIZE = (0.1, 0.1, 0.1)
+
+# start of a top level node, with its optional DEF name (e.g., 'DEF a Solid {')
+NODE = re.compile(r'^(?:DEF\s+(\S+)\s+)?([\w-]+)\s*\{', re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Item:
+    """
+    An object of the arena: an obstacle (box, wall) or a patch of floor. The
+    translation and rotation are the webots ones (NUE coordinates), while the
+    extent is the size of the object in the ground plane (x, z).
+    """
+
+    name: Optional[str]
+    translation: Tuple[float, float, float]
+    rotation: Tuple[float, float, float, float]
+    extent: Tuple[float, float]
+
+    # level perceived by the ground sensors (only for floors)
+    color: float = Colors.NONE.value
+
+
+@dataclass(frozen=True)
+class Arena:
+    """
+    Description of a world, as perceived by the robot: the rectangular arena
+    enclosed by walls, its obstacles and the floors over its ground. Just the
+    planar (x, z) geometry is considered.
+    """
+
+    center: Tuple[float, float] = (0.0, 0.0)
+    size: Tuple[float, float] = DEFAULT_FLOOR_SIZE
+    color: float = Colors.GRAY.value
+    obstacles: Tuple[Item, ...] = tuple()
+    floors: Tuple[Item, ...] = tuple()
+
+    # starting position and rotation of the robot
+    translation: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    rotation: Tuple[float, float, float, float] = (0.0, 1.0, 0.0, 0.0)
+
+
+def load(world_file: str, robot_name: str = 'evolvable') -> Arena:
+    """
+    Read the arena description from a webots world file. The boxes and the walls
+    are considered as obstacles (rotated only around the vertical axis), while
+    the solids with a plane geometry as floors, the top one hiding the others.
+    """
+
+    with open(world_file) as file:
+        world = file.read()
+
+    arena, obstacles, floors = dict(), list(), list()
+    for name, kind, body in nodes(world):
+
+        translation = vector(body, 'translation', (0.0, 0.0, 0.0))
+        rotation = vector(body, 'rotation', (0.0, 1.0, 0.0, 0.0))
+
+        if kind == 'RectangleArena':
+            arena.update(
+                center=(translation[0], translation[2]),
+                size=vector(body, 'floorSize', DEFAULT_FLOOR_SIZE),
+                color=level(vector(body, 'baseColor', (0.5, 0.5, 0.5)))
+            )
+        elif name == robot_name:
+            arena.update(translation=translation, rotation=rotation)
+        elif kind in ('SolidBox', 'Wall'):
+            x, _, z = vector(body, 'size', DEFAULT_SOLID_SIZE)
+            extent = planar((x, z), rotation)
+            obstacles.append(Item(name, translation, rotation, extent))
+        elif kind == 'Solid' and 'Plane' in body:
+            scale = vector(body, 'scale', (1.0, 1.0, 1.0))
+            x, z = vector(body, 'size', (1.0, 1.0))
+            extent = planar((x * scale[0], z * scale[2]), rotation)
+            color = level(vector(body, 'baseColor', (1.0, 1.0, 1.0)))
+            floors.append(Item(name, translation, rotation, extent, color))
+
+    return Arena(**arena, obstacles=tuple(obstacles), floors=tuple(floors))
+
+
+def nodes(world: str) -> List[Tuple[Optional[str], str, str]]:
+    """Split the world in its top level nodes: (DEF name, type, body) tuples."""
+
+    result, position = list(), 0
+    while match := NODE.search(world, position):
+        depth, position = 1, match.end()
+        while depth and position < len(world):
+            depth += {'{': 1, '}': -1}.get(world[position], 0)
+            position += 1
+        result.append((*match.groups(), world[match.end():position - 1]))
+    return result
+
+
+def vector(body: str, name: str, default: Tuple) -> Tuple:
+    """Get the first value of the field with the given name in the node."""
+
+    values = r'\s+'.join([r'(-?[\d.]+(?:e-?\d+)?)'] * len(default))
+    match = re.search(rf'\b{name}\s+{values}', body)
+    return tuple(map(float, match.groups())) if match else default
+
+
+def level(color: Tuple[float, float, float]) -> float:
+    """Convert an RGB color to the level perceived by the ground sensors."""
+
+    luminance = 0.2126 * color[0] + 0.7152 * color[1] + 0.0722 * color[2]
+    black, white = Colors.BLACK.value, Colors.WHITE.value
+    return black + luminance * (white - black)
+
+
+def planar(
+        extent: Tuple[float, float],
+        rotation: Tuple[float, float, float, float]
+) -> Tuple[float, float]:
+    """Get the axis-aligned extent of a rectangle rotated around the y axis."""
+
+    angle = rotation[3] if abs(rotation[1]) > 0.5 else 0.0
+    x, z = extent
+    return (
+        abs(x * cos(angle)) + abs(z * sin(angle)),
+        abs(x * sin(angle)) + abs(z * cos(angle))
+    )
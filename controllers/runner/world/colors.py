@@ -1,3 +1,5 @@
+import numpy as np
+
 from enum import Enum
 from numbers import Number
 from typing import Any
@@ -24,6 +26,16 @@ class Colors(Enum):
             return Colors.BLACK
         return Colors.GRAY
 
+    @staticmethod
+    def levels(values: np.ndarray) -> np.ndarray:
+        """Map an array of values to the values of their discrete colors."""
+
+        white, black = Colors.WHITE.value, Colors.BLACK.value
+        return np.select(
+            [values >= white - 50, values <= black + 50], [white, black],
+            Colors.GRAY.value
+        )
+
     def __eq__(self, other: Any) -> bool:
         other_value = other.value if isinstance(other, Colors) else other
         return other_value - 50 < self.value < other_value + 50
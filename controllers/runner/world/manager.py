@@ -1,34 +1,66 @@
-from robot.body import EPuck
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# the body depends on the manager (see 'EPuck.restore')
+if TYPE_CHECKING:
+    from robot.body import EPuck
 
 
 class Manager:
-    """Allows to gracefully manage the world."""
+    """
+    Allows to gracefully manage the world. The nodes and fields of the objects
+    are looked up once, by their def name, and then reused: the handles stay
+    valid also after a reset of the simulation.
+    """
 
-    def __init__(self, robot: EPuck, robot_name: str):
+    def __init__(self, robot: 'EPuck', robot_name: str):
         self.robot = robot
         self.robot_name = robot_name
         self.savings = dict()
+        self.nodes = dict()
+        self.fields = dict()
 
     def commit(self, ensure: bool = True):
-        """Ensure that the modifications took place."""
-        self.robot.getFromDef(self.robot_name).resetPhysics()
+        """
+        Ensure that the modifications took place. If 'ensure' is set, a step of
+        the simulation is spent to apply them immediately; otherwise they are
+        applied by the next step of the controller, at no cost.
+        """
+        self.__node(self.robot_name).resetPhysics()
         if ensure:
             self.robot.step(self.robot.run_frequency.ms)
 
     def move(self, name: str, to: List[float], can_intersect: bool = True):
         """Move the def-specified object to the given position."""
-        if field := self.__field(name, 'translation'):
+        self.move_many({name: to}, can_intersect)
+
+    def move_many(
+            self,
+            positions: Dict[str, List[float]],
+            can_intersect: bool = True
+    ) -> List[str]:
+        """
+        Move the def-specified objects to the given positions. If the objects
+        cannot intersect, the ones touching something after the move are
+        restored to their position. Return the objects not moved (i.e., the
+        restored and the not existing ones).
+        """
+        blocked = list()
+        for name, to in positions.items():
+            if not (field := self.__field(name, 'translation')):
+                blocked.append(name)
+                continue
             old_position = field.getSFVec3f()
             field.setSFVec3f(to)
-            if not can_intersect and len(self.__node(name).getContactPoints()):
+            if not can_intersect and self.__node(name).getContactPoints():
                 field.setSFVec3f(old_position)
+                blocked.append(name)
+        return blocked
 
-    def position(self, name: str):
+    def position(self, name: str) -> Optional[List[float]]:
         """Get the def-specified object's position."""
-        if not self.__field(name, 'translation'):
-            return None
-        return self.robot.getFromDef(name).getField('translation').getSFVec3f()
+        if field := self.__field(name, 'translation'):
+            return field.getSFVec3f()
+        return None
 
     def reset(self, name: str):
         """Reset the def-specified object to a previously saved state."""
@@ -37,26 +69,40 @@ class Manager:
         self.move(name, position)
         self.rotate(name, rotation)
 
+    def restore(self):
+        """Reset all the saved objects, stopping them (see 'save')."""
+        for name in self.savings:
+            self.reset(name)
+            self.__node(name).resetPhysics()
+
     def rotate(self, name: str, to: List[float]):
         """Move the def-specified object to the given rotation."""
-        if not self.__field(name, 'rotation'):
-            return None
-        self.robot.getFromDef(name).getField('rotation').setSFRotation(to)
+        if field := self.__field(name, 'rotation'):
+            field.setSFRotation(to)
 
     def save(self, name: str):
         """Save the state (position & rotation) of the def-specified object."""
-        if (
-            not self.__field(name, 'translation')
-            or
-            not self.__field(name, 'rotation')
-        ):
+        translation = self.__field(name, 'translation')
+        rotation = self.__field(name, 'rotation')
+        if not translation or not rotation:
             return None
         self.savings[name] = (
-            self.robot.getFromDef(name).getField('translation').getSFVec3f(),
-            self.robot.getFromDef(name).getField('rotation').getSFRotation()
+            translation.getSFVec3f(), rotation.getSFRotation()
         )
 
-    def __node(self, name: str): return self.robot.getFromDef(name)
+    def objects(self) -> List[str]:
+        """Get the def names of the top level objects of the world."""
+        children = self.robot.getRoot().getField('children')
+        nodes = map(children.getMFNode, range(children.getCount()))
+        return [_ for _ in (node.getDef() for node in nodes) if _]
+
+    def __node(self, name: str):
+        if name not in self.nodes:
+            self.nodes[name] = self.robot.getFromDef(name)
+        return self.nodes[name]
 
     def __field(self, node: str, field: str):
-        return self.__node(node) and self.__node(node).getField(field)
+        if (node, field) not in self.fields:
+            instance = self.__node(node)
+            self.fields[node, field] = instance and instance.getField(field)
+        return self.fields[node, field]
@@ -0,0 +1,66 @@
+import numpy as np
+
+from dataclasses import dataclass
+from random import random
+from typing import Iterable, List
+from world.manager import Manager
+
+
+@dataclass
+class Motion:
+    """
+    Motion of the movable objects of the world. Their positions and velocities
+    (one row per object) are kept here, so that they are integrated all at once
+    and the world is just written, never polled, while they move.
+    """
+
+    names: List[str]
+    positions: np.ndarray
+    velocities: np.ndarray
+
+    # maximum distance of the objects from the center of the world
+    bound: float
+
+
+def new(manager: Manager, names: Iterable[str], bound: float) -> Motion:
+    """
+    Start the motion of the given objects from their current positions, still.
+    The objects that do not exist in the world are ignored.
+    """
+
+    positions = {_: manager.position(_) for _ in names}
+    positions = {k: v for k, v in positions.items() if v is not None}
+    return Motion(
+        list(positions),
+        np.array(list(positions.values()), dtype=float).reshape(-1, 3),
+        np.zeros((len(positions), 3)),
+        bound
+    )
+
+
+def steer(instance: Motion, speed: float):
+    """
+    Randomly change the direction of the objects in the ground plane, with a
+    velocity (per step) up to the given speed on each axis.
+    """
+
+    # the python generator is used, as its state is the checkpointed one
+    directions = np.array([random() for _ in range(2 * len(instance.names))])
+    instance.velocities[:, [0, 2]] = (directions.reshape(-1, 2) * 2 - 1) * speed
+
+
+def advance(instance: Motion, manager: Manager):
+    """
+    Move the objects of a step, keeping them in the world bounds. The objects
+    that would intersect others stay still.
+    """
+
+    positions = np.clip(
+        instance.positions + instance.velocities, -instance.bound,
+        instance.bound
+    )
+    blocked = manager.move_many(
+        dict(zip(instance.names, positions.tolist())), can_intersect=False
+    )
+    moved = np.array([_ not in blocked for _ in instance.names], dtype=bool)
+    instance.positions[moved] = positions[moved]
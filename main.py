@@ -1,29 +1,153 @@
+import heapq
+import os
+import re
+import shutil
+import signal
 import subprocess
 import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
 
 # get process parameters:
 # - first: process name
 # - second: world file's name
-# - third: not expected parameters
-_0, world_name, *_1 = *sys.argv, None
+# - third: number of webots instances (workers) sharing the simulations
+# - fourth: not expected parameters
+_0, world_name, workers, *_1 = *sys.argv, None, None
 
 # define world file location and use default file if none is specified
 __WORLD_FILE = f'worlds/{world_name or "main_world"}.wbt'
 
+# define the number of parallel instances and the folder they share
+__WORKERS = int(workers or 1)
+__CONFIGURATIONS_LOCATION = 'res/configuration'
+__SAVING_FOLDER = datetime.today().strftime('%Y-%m-%d.%H%M%S%f')
+__SAVE_PATH = os.path.join(__CONFIGURATIONS_LOCATION, __SAVING_FOLDER)
+
+# supervision of the instances: an instance that does not log anything for the
+# stall timeout (seconds) is considered crashed, as one that exits with errors.
+# Crashed instances are restarted up to the given times
+POLL_INTERVAL = 30
+STALL_TIMEOUT = 60 * 60
+MAX_RESTARTS = 5
+
+# first virtual display used by the instances (one each, if Xvfb is available)
+FIRST_DISPLAY = 100
+
+# start of a log record (see 'log_format' in the logger settings)
+RECORD_START = re.compile(r'^\[\d{4}-\d{2}-\d{2} ')
+
+
+def virtual_display(shard: int) -> Optional[subprocess.Popen]:
+    """Start a virtual display for the instance, if Xvfb is available."""
+
+    if __WORKERS <= 1 or not shutil.which('Xvfb'):
+        return None
+    return subprocess.Popen(
+        ['Xvfb', f':{FIRST_DISPLAY + shard}', '-screen', '0', '1024x768x16'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def run(shard: int, environment: dict) -> bool:
+    """
+    Run a webots instance and wait for its end. Return if it succeeded, that is,
+    if it exited without errors and without stalling.
+    """
+
+    log_name = f'log.{shard}' if __WORKERS > 1 else 'log'
+    log_file = os.path.join(__SAVE_PATH, log_name)
+
+    # start a simulation subprocess (in its own group, to be killed with it)
+    process = subprocess.Popen([
+        'webots ' +
+        '--mode=fast ' +        # fast running
+        '--no-rendering ' +     # disable rendering
+        '--minimize ' +         # minimize the window on startup
+        '--batch ' +            # does not create blocking pop-ups
+        '--stdout ' +           # redirect robot out to stdout
+        '--stderr ' +           # redirect robot errors to stderr
+        '--log-performance=stdout ' +   # measure the performance
+        __WORLD_FILE
+    ], shell=True, env=environment, start_new_session=True)
+
+    # a crashed controller leaves webots running: watch the log activity
+    start = time.time()
+    while process.poll() is None:
+        time.sleep(POLL_INTERVAL)
+        activity = os.path.getmtime(log_file) if os.path.exists(log_file) else 0
+        if time.time() - max(start, activity) > STALL_TIMEOUT:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+            return False
+
+    return process.returncode == 0
+
+
+def simulate(shard: int):
+    """
+    Start and supervise a webots instance running the given shard of the
+    simulations. If it crashes, the instance is restarted: it then continues
+    from the last simulation saved.
+    """
+
+    environment = dict(os.environ)
+    environment['RUNNER_SHARD'] = f'{shard}/{__WORKERS}'
+    environment['RUNNER_SAVE_FOLDER'] = __SAVING_FOLDER
+
+    display = virtual_display(shard)
+    if display:
+        environment['DISPLAY'] = f':{FIRST_DISPLAY + shard}'
+
+    try:
+        for attempt in range(MAX_RESTARTS + 1):
+            if run(shard, environment):
+                return
+            attempts = f'{attempt + 1}/{MAX_RESTARTS + 1}'
+            print(f'Instance {shard} crashed (attempt {attempts})')
+        print(f'Instance {shard} abandoned')
+    finally:
+        if display:
+            display.terminate()
+
+
+def records(path: str) -> Iterator[str]:
+    """Read the log file by records (a record can span more lines)."""
+
+    with open(path) as file:
+        record = ''
+        for line in file:
+            if RECORD_START.match(line) and record:
+                yield record
+                record = ''
+            record += line
+        if record:
+            yield record
+
+
+def merge_logs(paths: Iterable[str], destination: str):
+    """Merge the given log files in a single one, in chronological order."""
+
+    with open(destination, 'a') as file:
+        file.writelines(heapq.merge(*map(records, paths)))
+    for path in paths:
+        os.remove(path)
+
+
 ################################################################################
 # START OF SIMULATION
 
-print(f'Running simulation in {__WORLD_FILE}')
-
-# start a simulation subprocess
-subprocess.run([
-    'webots ' +
-    '--mode=fast ' +        # fast running
-    '--no-rendering ' +     # disable rendering
-    '--minimize ' +         # minimize the window on startup
-    '--batch ' +            # does not create blocking pop-ups
-    '--stdout ' +           # redirect robot out to stdout
-    '--stderr ' +           # redirect robot errors to stderr
-    '--log-performance=stdout ' +   # measure the performance
-    __WORLD_FILE
-], shell=True, check=True)
+print(f'Running simulation in {__WORLD_FILE} with {__WORKERS} instance(s)')
+
+# run the instances in parallel, each one on its own shard of the simulations
+with ThreadPoolExecutor(max_workers=__WORKERS) as pool:
+    list(pool.map(simulate, range(__WORKERS)))
+
+# merge the instances logs in the one of the configuration folder
+if __WORKERS > 1:
+    logs = [os.path.join(__SAVE_PATH, f'log.{_}') for _ in range(__WORKERS)]
+    logs = [*filter(os.path.exists, logs)]
+    merge_logs(logs, os.path.join(__SAVE_PATH, 'log'))
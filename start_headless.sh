@@ -11,7 +11,7 @@ if [[ $1 == '-h' ]]; then
     simulation in it.
 
     Synopsys:
-      /path/to/start_headless.sh -h | MAIN_FILE.py
+      /path/to/start_headless.sh -h | MAIN_FILE.py [WORLD] [WORKERS]
   '
   exit
 fi
@@ -0,0 +1,217 @@
+"""
+Benchmarks of the hot paths of the controller, runnable without Webots (the
+robot is the surrogate one). From the root of the repository:
+
+    PYTHONPATH=controllers/runner python test/benchmark/benchmark.py [output]
+
+The timings are saved in the output json file (default 'results.json' beside
+this script) and compared with the ones of the baseline ('baseline.json' beside
+this script), if present. The benchmarks slower than the baseline by more than
+the tolerance are reported and the script exits with an error. To store a new
+baseline, run the benchmarks with the baseline as output file. The timings are
+machine dependent: compare just runs on the same machine.
+"""
+import json
+import numpy as np
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from logger import logger, Settings, setup
+from math import sqrt
+from nanowire_network_simulator.model.device import Datasheet
+from optimization.simulation import optimize
+from optimization.utils import DEVICE_SIZE, WIRES_LENGTH, SimulationSpec
+from optimization.utils import expand, import_simulations, save
+from robot.cortex import new, stimulate
+from os.path import join
+from robot.surrogate import Surrogate
+from typing import Callable, Dict
+from world.arena import load
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+BASELINE = join(FOLDER, 'baseline.json')
+WORLD = join(FOLDER, '..', '..', 'worlds', 'main_world.wbt')
+
+# seed of the devices and of the random choices (e.g., the io mapping)
+SEED = 1234
+
+# executions of each benchmark, summarized by their median
+REPEATS = 3
+
+# maximum slowdown with respect to the baseline (ratio of the medians)
+TOLERANCE = 1.25
+
+# densities of the devices (as in 'config.py') and their motors load
+DENSITIES = (5.0, 7.5, 10.0)
+LOAD = 1e4
+
+# wires of the stimulated devices (with the same density) and stimulations
+WIRES = (50, 100, 300, 500)
+DENSITY = 7.5
+TICKS = 100
+
+# evolution benchmarked: epochs and their duration (steps) on a sparse cortex
+EPOCHS, EPOCH_DURATION = 3, 50
+
+# the log and the archives of the benchmarks are kept in a temporary folder
+workspace = tempfile.TemporaryDirectory()
+setup(logger, Settings(path=workspace.name + '/'))
+
+sensors = tuple(f'ps{_}' for _ in range(8))
+body = Surrogate(sensors, load(WORLD))
+
+
+def measure(function: Callable[[], None]) -> Dict:
+    """Time the repeated executions of a function (seconds)."""
+
+    timings = list()
+    for _ in range(REPEATS):
+        random.seed(SEED)
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return dict(
+        median=statistics.median(timings), min=min(timings), repeats=REPEATS
+    )
+
+
+def per(result: Dict, count: int) -> Dict:
+    """Divide the timings of a benchmark by the count of its operations."""
+
+    return dict(
+        result, median=result['median'] / count, min=result['min'] / count
+    )
+
+
+def specification(density: float) -> SimulationSpec:
+    """Get the benchmarked simulation of a device of the given density."""
+
+    return SimulationSpec(
+        'COLLISION_AVOIDANCE', EPOCHS, EPOCH_DURATION, density, LOAD, SEED
+    )
+
+
+def generation() -> Dict[str, Dict]:
+    """Time the generation of the devices of the configured densities."""
+
+    def device(density: float):
+        size = DEVICE_SIZE
+        wires = round(density * size ** 2 / WIRES_LENGTH ** 2)
+        return Datasheet(
+            wires_count=wires, Lx=size, Ly=size, mean_length=WIRES_LENGTH,
+            seed=SEED
+        )
+
+    return {
+        f'cortex.new/density={_}': measure(lambda: new(device(_)))
+        for _ in DENSITIES
+    }
+
+
+def stimulation() -> Dict[str, Dict]:
+    """
+    Time a stimulation (tick) of devices of growing size, with both backends.
+    The first nodes are stimulated as sensors, the last ones are loaded.
+    """
+
+    results = dict()
+    for wires in WIRES:
+        size = WIRES_LENGTH * sqrt(wires / DENSITY)
+        datasheet = Datasheet(
+            wires_count=wires, Lx=size, Ly=size, mean_length=WIRES_LENGTH,
+            seed=SEED
+        )
+        for sparse in (False, True):
+            cortex = new(datasheet, sparse)
+            nodes = list(cortex.network.nodes)
+            inputs, loads = nodes[:len(sensors)], nodes[-2:]
+            voltages = np.linspace(0.0, 10.0, TICKS)
+
+            def run():
+                for value in voltages.tolist():
+                    stimulate(
+                        cortex, body.run_frequency.s,
+                        [(_, value) for _ in inputs],
+                        [(_, LOAD) for _ in loads]
+                    )
+
+            backend = 'sparse' if sparse else 'graph'
+            results[f'stimulate/wires={wires}/{backend}'] = per(
+                measure(run), TICKS
+            )
+    return results
+
+
+def evolution() -> Dict[str, Dict]:
+    """
+    Time the lives of the individuals of a (1+1) evolution on the surrogate: the
+    elite and a challenger per epoch. The devices are generated beforehand.
+    """
+
+    simulations = iter([
+        expand(specification(DENSITY), body, sparse=True)
+        for _ in range(REPEATS)
+    ])
+    result = measure(lambda: optimize(next(simulations)))
+    return {'optimize/epoch': per(result, EPOCHS + 1)}
+
+
+def persistence() -> Dict[str, Dict]:
+    """Time the save of an evolved individual and the import of its archive."""
+
+    random.seed(SEED)
+    simulation = optimize(expand(specification(DENSITY), body, sparse=True))
+    settings = simulation.goal_task, EPOCHS, EPOCH_DURATION, None, None
+
+    folder = join(workspace.name, 'simulations')
+    os.makedirs(folder)
+    path = join(folder, 'simulation.0.npz')
+    saving = measure(lambda: save(simulation.elite, path, 0))
+    importing = measure(lambda: list(
+        import_simulations(body, settings, folder, sparse=True)
+    ))
+    return {'save': saving, 'import_simulations': importing}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> bool:
+    """Print the ratio of the timings to the baseline ones. Return if slower."""
+
+    regressed = False
+    for name, result in results.items():
+        if name not in baseline:
+            print(f'{name}: {result["median"] * 1e3:.3f} ms (no baseline)')
+            continue
+        ratio = result['median'] / baseline[name]['median']
+        slower = ratio > TOLERANCE
+        regressed |= slower
+        print(
+            f'{name}: {result["median"] * 1e3:.3f} ms, x{ratio:.2f} the '
+            f'baseline' + (' (REGRESSION)' if slower else '')
+        )
+    return regressed
+
+
+output = sys.argv[1] if len(sys.argv) > 1 else join(FOLDER, 'results.json')
+results = {
+    **generation(), **stimulation(), **evolution(), **persistence()
+}
+with open(output, 'w') as file:
+    json.dump(dict(
+        environment=dict(
+            python=platform.python_version(), numpy=np.__version__,
+            machine=platform.machine(), processor=platform.processor()
+        ),
+        results=results
+    ), file, indent=4)
+
+# the output is compared with the baseline (unless it is the new baseline)
+baseline = dict()
+if os.path.abspath(output) != BASELINE and os.path.isfile(BASELINE):
+    with open(BASELINE) as file:
+        baseline = json.load(file)['results']
+sys.exit(compare(results, baseline))
@@ -0,0 +1,78 @@
+import networkx as nx
+import numpy as np
+import os
+
+from controllers.runner.optimization.archive import entries, history, matrix
+from controllers.runner.optimization.archive import read, register, save
+from controllers.runner.optimization.archive import signals
+from controllers.runner.optimization.biography import History
+from nanowire_network_simulator.model.device import Datasheet
+from tempfile import TemporaryDirectory
+
+
+generator = np.random.default_rng(0)
+
+graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(3, 3))
+nx.set_node_attributes(graph, {_: generator.uniform(0, 10) for _ in graph}, 'V')
+nx.set_edge_attributes(
+    graph, {_: generator.uniform() for _ in graph.edges}, 'Y'
+)
+nx.set_edge_attributes(graph, 0.0, 'g')
+graph.graph['name'] = 'grid'
+
+datasheet = Datasheet(wires_count=9, seed=42)
+wires = dict(xa=generator.uniform(size=9), length=10.0, number_of_wires=9)
+io = dict(
+    inputs={'ps0': 0, 'gs0': 4}, outputs={'left': 8}, load=1e4,
+    multiplier={'ps0': 0.5, 'gs0': 1.0}
+)
+
+stimulus, response = History(), History()
+for _ in range(20):
+    stimulus.append(dict(zip(['ps0', 'gs0'], generator.uniform(0, 10, 2))))
+    response.append({'left': generator.uniform()})
+
+with TemporaryDirectory() as folder:
+    path = os.path.join(folder, 'simulation.0.npz')
+    save(path, datasheet, graph, wires, io, stimulus, response)
+
+    # the device is read as it was saved
+    read_graph, read_datasheet, read_wires, read_io = read(path)
+    assert vars(read_datasheet) == vars(datasheet)
+    assert read_io == io
+    assert read_graph.graph == graph.graph
+    assert dict(read_graph.nodes(data=True)) == dict(graph.nodes(data=True))
+    assert sorted(read_graph.edges(data=True)) == sorted(graph.edges(data=True))
+    assert read_wires.keys() == wires.keys()
+    assert np.array_equal(read_wires['xa'], wires['xa'])
+    assert read_wires['length'] == 10.0
+
+    # the histories are loaded in memory, with their columns
+    for name, original in [('stimulus', stimulus), ('response', response)]:
+        loaded = history(path, name)
+        assert loaded.columns == original.columns
+        assert np.array_equal(loaded.array, original.array)
+        assert list(loaded) == list(original)
+
+    # or they are memory-mapped, without loading them
+    columns, values = matrix(path, 'stimulus')
+    assert isinstance(values, np.memmap) and not values.flags.writeable
+    assert columns == ('ps0', 'gs0')
+    assert np.array_equal(values, stimulus.array)
+    collapsed = signals(path, 'response')
+    assert collapsed.keys() == {'left'}
+    assert np.array_equal(collapsed['left'], response.array[:, 0])
+
+    # an empty history is not mapped
+    save(path, datasheet, graph, wires, io, History(['ps0']), History())
+    columns, values = matrix(path, 'stimulus')
+    assert columns == ('ps0',) and values.shape == (0, 1)
+
+    # the manifest keeps the last entry of each simulation, by index
+    register(folder, dict(index=1, archive='simulation.1.npz'))
+    register(folder, dict(index=0, archive='simulation.0.npz', fitness=1.0))
+    register(folder, dict(index=0, archive='simulation.0.npz', fitness=2.0))
+    assert [(_['index'], _.get('fitness')) for _ in entries(folder)] == [
+        (0, 2.0), (1, None)
+    ]
+    assert entries(os.path.join(folder, 'missing')) == []
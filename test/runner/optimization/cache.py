@@ -0,0 +1,68 @@
+import controllers.runner.optimization.cache as cache
+import os
+import random
+import time
+
+from controllers.runner.optimization.cache import cached, key
+from controllers.runner.optimization.utils import SimulationSpec, expand
+from nanowire_network_simulator.model.device import Datasheet
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+
+def files(folder: str):
+    return sorted(_ for _ in os.listdir(folder) if _.endswith('.npz'))
+
+
+def device(seed: int): return Datasheet(wires_count=20, seed=seed)
+
+
+with TemporaryDirectory() as folder:
+    supplier = cached(folder, capacity=2)
+
+    # a generated device is saved, and reused when requested again
+    generated = supplier(device(1))
+    assert files(folder) == [key(device(1)) + '.npz']
+    reused = supplier(device(1))
+    assert vars(reused.datasheet) == vars(generated.datasheet)
+    assert dict(reused.network.nodes(data=True)) == \
+        dict(generated.network.nodes(data=True))
+    assert sorted(reused.network.edges(data=True)) == \
+        sorted(generated.network.edges(data=True))
+    assert files(folder) == [key(device(1)) + '.npz']
+
+    # a cached device can be backed by the sparse representation
+    assert supplier(device(1), True).circuit is not None
+
+    # beyond the capacity, the least recently used devices are evicted
+    time.sleep(0.01)
+    supplier(device(2))
+    time.sleep(0.01)
+    supplier(device(1))
+    time.sleep(0.01)
+    supplier(device(3))
+    assert files(folder) == sorted(key(device(_)) + '.npz' for _ in (1, 3))
+
+# a campaign within the capacity reuses all its devices when run again
+generated = list()
+generate = cache.new_cortex
+cache.new_cortex = lambda *_: generated.append(_) or generate(*_)
+with TemporaryDirectory() as folder:
+    supplier = cached(folder, capacity=4)
+    for _ in range(2):
+        for seed in range(4):
+            supplier(device(seed))
+    assert len(generated) == 4
+cache.new_cortex = generate
+
+# a reused device is connected to the robot as a generated one, whatever the
+# state of the random generator
+robot = SimpleNamespace(sensors=('ps0', 'ps7'), motors=('left', 'right'))
+spec = SimulationSpec('COLLISION_AVOIDANCE', 1, 10, 5.0, 1e4, 3)
+with TemporaryDirectory() as folder:
+    random.seed(1)
+    generated = expand(spec, robot, cache=folder).elite
+    random.seed(2)
+    reused = expand(spec, robot, cache=folder).elite
+    assert reused.pyramid == generated.pyramid
+    assert reused.thalamus == generated.thalamus
@@ -0,0 +1,73 @@
+import networkx as nx
+import numpy as np
+import os
+
+from controllers.runner.optimization.archive import register, save
+from controllers.runner.optimization.biography import History
+from controllers.runner.optimization.shard import Shard
+from controllers.runner.optimization.task.run.fitness import \
+    Fitness as RunFitness
+from controllers.runner.optimization.task.tmaze.fitness import \
+    Fitness as TMazeFitness
+from controllers.runner.optimization.utils import import_simulations, measure
+from controllers.runner.optimization.utils import Tasks, set_measure, specify
+from nanowire_network_simulator.model.device import Datasheet
+from tempfile import TemporaryDirectory
+
+
+task = Tasks.COLLISION_AVOIDANCE.value
+settings = (task, 5, 10, None, None)
+
+# the specifications are indexed by their setting, also in a shard
+devices = [(density, 1e4, 1) for density in [5.0, 7.5, 10.0, 12.5, 15.0]]
+assert [_.index for _ in specify(settings, devices)] == [0, 1, 2, 3, 4]
+assert [_.index for _ in Shard(1, 2).select(specify(settings, devices))] == [
+    1, 3
+]
+
+# the imported simulations keep the index of their manifest entry
+graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(3, 3))
+nx.set_node_attributes(graph, 0.0, 'V')
+nx.set_edge_attributes(graph, Datasheet().Y_min, 'Y')
+io = dict(inputs={'ps0': 0}, outputs={'left': 8}, load=1e4)
+with TemporaryDirectory() as folder:
+    for index, density in enumerate([5.0, 7.5, 10.0]):
+        archive = f'simulation.{index}.npz'
+        save(
+            os.path.join(folder, archive), Datasheet(wires_count=9, seed=1),
+            graph, dict(), io, History(), History()
+        )
+        register(folder, dict(index=index, archive=archive, density=density))
+    simulations = import_simulations(
+        None, settings, folder, where=lambda _: _['density'] > 5.0
+    )
+    assert [_.index for _ in simulations] == [1, 2]
+
+    # the simulations to skip are not read, but the others are still imported
+    simulations = import_simulations(None, settings, folder, skip={0, 2})
+    assert [_.index for _ in simulations] == [1]
+    os.remove(os.path.join(folder, 'simulation.0.npz'))
+    assert [_.index for _ in import_simulations(
+        None, settings, folder, skip={0}
+    )] == [1, 2]
+
+# the measure of an evaluator is saved and restored with its types
+evaluator = TMazeFitness()
+evaluator.initial_color = type(evaluator.initial_color)['WHITE']
+evaluator.fitness, evaluator.counter = np.float64(0.5), 3
+restored = TMazeFitness()
+set_measure(restored, measure(evaluator))
+assert vars(restored) == vars(evaluator)
+
+# the attributes bound to the world are not saved, the sequences are
+evaluator = RunFitness()
+evaluator.position, evaluator.distance = [0.25, -0.5], 1.0
+assert measure(evaluator) == dict(distance=1.0, position=[0.25, -0.5])
+
+# the values that cannot be saved are not silently lost
+evaluator.position = object()
+try:
+    measure(evaluator)
+    assert False
+except TypeError:
+    pass
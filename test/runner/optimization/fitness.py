@@ -0,0 +1,90 @@
+import numpy as np
+
+from controllers.runner.optimization.biography import History, new
+from controllers.runner.optimization.biography import observations
+from controllers.runner.optimization.task.avoidance.area.fitness import \
+    Fitness as AreaFitness
+from controllers.runner.optimization.task.avoidance.collision.fitness import \
+    Fitness as CollisionFitness
+from controllers.runner.optimization.task.tmaze.fitness import \
+    Fitness as TMazeFitness
+from controllers.runner.robot.observation import Observation, Observations
+from controllers.runner.world.colors import Colors
+
+
+generator = np.random.default_rng(0)
+steps, sensors, motors = 200, ['gs0', 'ps0', 'ps7'], ['left', 'right']
+
+# readings of the ground sensor on the three floors, random proximity readings
+normalized = {_: generator.uniform(0, 1, steps) for _ in sensors}
+normalized['gs0'] = generator.choice([300, 600, 900], steps) / 4095
+readings = {k: v * 4095 for k, v in normalized.items()}
+speeds = {_: generator.uniform(-6.28, 6.28, steps) for _ in motors}
+recording = Observations(readings, normalized, speeds)
+
+
+def stream(evaluator, count=steps):
+    """Update the evaluator with the first steps of the recording."""
+    for step in range(count):
+        evaluator.update(Observation(
+            {k: v[step] for k, v in readings.items()},
+            {k: v[step] for k, v in normalized.items()},
+            {k: v[step] for k, v in speeds.items()}
+        ))
+    return evaluator
+
+
+# the vectorized evaluation gives the value of the streaming updates
+for kind in [CollisionFitness, AreaFitness]:
+    evaluator = stream(kind())
+    assert np.isclose(kind().evaluate(recording), evaluator.value())
+    assert kind().evaluate(Observations(*(
+        {k: v[:0] for k, v in _.items()} for _ in (readings, normalized, speeds)
+    ))) == 0.0
+
+# the colors of the evaluator are the ones of the runner (imported top level)
+tmaze = TMazeFitness()
+tmaze.initial_color = type(tmaze.initial_color)[Colors.WHITE.name]
+assert np.isclose(tmaze.evaluate(recording), stream(tmaze).value())
+
+# the t-maze evaluation cannot guess the initial color of a recorded life
+try:
+    TMazeFitness().evaluate(recording)
+    assert False
+except ValueError:
+    pass
+
+# the evaluation continues from the state of the evaluator, without changing it
+evaluator = stream(CollisionFitness(), 50)
+value, tail = evaluator.value(), Observations(
+    {k: v[50:] for k, v in readings.items()},
+    {k: v[50:] for k, v in normalized.items()},
+    {k: v[50:] for k, v in speeds.items()}
+)
+assert np.isclose(evaluator.evaluate(tail), stream(CollisionFitness()).value())
+assert evaluator.value() == value
+
+# the observations of a recorded life are the original ones (if not saturated)
+multiplier = {'gs0': 1.0, 'ps0': 0.5, 'ps7': 0.8}
+biography = new(
+    CollisionFitness(), dict.fromkeys(sensors), dict.fromkeys(motors)
+)
+for step in range(steps):
+    biography.stimulus.append({
+        k: min(10.0, 10 * v[step] * multiplier[k])
+        for k, v in normalized.items()
+    })
+    biography.response.append({
+        k: (6.28 - v[step]) / 12.56 for k, v in speeds.items()
+    })
+recorded = observations(biography, multiplier)
+assert all(np.allclose(recorded.readings[_], readings[_]) for _ in sensors)
+assert all(np.allclose(recorded.speeds[_], speeds[_]) for _ in motors)
+assert isinstance(biography.stimulus, History)
+
+# the sensors not stimulating the network are at the minimum of their range
+multiplier['ps0'] = 0.0
+recorded = observations(biography, multiplier)
+assert np.all(recorded.normalized['ps0'] == 0.0)
+assert np.all(recorded.readings['ps0'] == 0.0)
+assert np.isfinite(CollisionFitness().evaluate(recorded))
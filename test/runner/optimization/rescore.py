@@ -0,0 +1,112 @@
+import json
+import networkx as nx
+import numpy as np
+import os
+
+from controllers.runner.optimization.archive import register, save
+from controllers.runner.optimization.biography import History
+from controllers.runner.optimization.rescore import evaluation, rescore
+from controllers.runner.optimization.rescore import sources
+from controllers.runner.optimization.task.avoidance.collision.fitness import \
+    Fitness as CollisionFitness
+from controllers.runner.optimization.task.tmaze.fitness import \
+    Fitness as TMazeFitness
+from controllers.runner.robot.observation import Observation
+from nanowire_network_simulator import backup
+from nanowire_network_simulator.model.device import Datasheet
+from tempfile import TemporaryDirectory
+
+
+generator = np.random.default_rng(0)
+steps, sensors, motors = 100, ['ps0', 'ps7'], ['left', 'right']
+
+# a device and a life, whose inputs never saturate the network
+graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(4, 4))
+nx.set_node_attributes(graph, 0.0, 'V')
+nx.set_edge_attributes(graph, Datasheet().Y_min, 'Y')
+datasheet = Datasheet(wires_count=16, seed=7)
+io = dict(
+    inputs={'ps0': 0, 'ps7': 3}, outputs={'left': 12, 'right': 15}, load=1e4,
+    multiplier={'ps0': 0.5, 'ps7': 1.0}
+)
+
+normalized = {_: generator.uniform(0, 1, steps) for _ in sensors}
+speeds = {_: generator.uniform(-6.28, 6.28, steps) for _ in motors}
+stimulus, response = History(), History()
+for step in range(steps):
+    stimulus.append({
+        k: 10 * v[step] * io['multiplier'][k] for k, v in normalized.items()
+    })
+    response.append({k: (6.28 - v[step]) / 12.56 for k, v in speeds.items()})
+
+
+def dat(folder: str, name: str, index: int = 0) -> str:
+    return os.path.join(folder, f'{name}.{index}.dat')
+
+
+# the fitness that the life got while living
+evaluator = CollisionFitness()
+for step in range(steps):
+    values = {k: v[step] for k, v in normalized.items()}
+    evaluator.update(Observation(
+        values, values, {k: v[step] for k, v in speeds.items()}
+    ))
+
+with TemporaryDirectory() as folder:
+
+    # a life saved in an archive, indexed by the manifest
+    archived = os.path.join(folder, 'archived')
+    os.makedirs(archived)
+    path = os.path.join(archived, 'simulation.0.npz')
+    save(path, datasheet, graph, dict(), io, stimulus, response)
+    register(archived, dict(index=0, archive='simulation.0.npz'))
+
+    # a life saved in the data files of the old runs, next to an incomplete one
+    legacy = os.path.join(folder, 'legacy')
+    os.makedirs(legacy)
+    device = ['datasheet', 'network', 'wires', 'connections']
+    backup.save(
+        datasheet, graph, dict(), io, *(dat(legacy, _) for _ in device)
+    )
+    for name, history in [('stimulus', stimulus), ('response', response)]:
+        with open(dat(legacy, name), 'w') as output:
+            json.dump(list(history), output)
+    with open(dat(legacy, 'stimulus', 1), 'w') as output:
+        json.dump(list(stimulus), output)
+    open(os.path.join(legacy, 'README.md'), 'w').close()
+    assert len(sources(legacy)) == 1
+
+    # both the lives are scored again as they were scored while living
+    for run in (archived, legacy):
+        record, = rescore(run, evaluation(CollisionFitness), 1)
+        fitness, = record.pop('fitness')
+        assert np.isclose(fitness, evaluator.value())
+        assert record['load'] == 1e4
+        assert record['multiplier'] == io['multiplier']
+        assert record['avg_multiplier'] == 75.0
+        assert record['density'] > 0 and record['cc_density'] > 0
+
+    # the old lives without multipliers had them set to 1
+    legacy = os.path.join(folder, 'unitary')
+    os.makedirs(legacy)
+    unitary = dict(io, multiplier=[])
+    backup.save(
+        datasheet, graph, dict(), unitary, *(dat(legacy, _) for _ in device)
+    )
+    for name, history in [('stimulus', stimulus), ('response', response)]:
+        with open(dat(legacy, name), 'w') as output:
+            json.dump(list(history), output)
+    record, = rescore(legacy, evaluation(CollisionFitness), 1)
+    assert record['multiplier'] == {'ps0': 1.0, 'ps7': 1.0}
+    assert record['avg_multiplier'] == 100.0
+
+    # the lives are scored the same way in parallel
+    formula = evaluation(CollisionFitness)
+    assert rescore(archived, formula, 2) == rescore(archived, formula, 1)
+
+    # the scores that the lives cannot give are not guessed
+    try:
+        rescore(archived, evaluation(TMazeFitness), 1)
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,13 @@
+from controllers.runner.optimization.simulation import promising
+
+
+# the challengers a bit worse than the elite are promising, the others are not
+assert promising(80.0, 80.0) and promising(75.0, 80.0)
+assert not promising(70.0, 80.0)
+
+# also when the elite score is null or negative
+assert promising(0.0, 0.0) and promising(0.5, 0.0)
+assert not promising(-0.5, 0.0)
+assert promising(-20.0, -20.0) and promising(-21.0, -20.0)
+assert promising(5.0, -20.0)
+assert not promising(-25.0, -20.0)
@@ -0,0 +1,67 @@
+import json
+import numpy as np
+import random
+
+from controllers.runner.optimization.strategy import Distribution, batch, comma
+from controllers.runner.optimization.strategy import from_state, sample, state
+from controllers.runner.optimization.strategy import tournament
+from controllers.runner.optimization.strategy import truncation, update
+from types import SimpleNamespace
+
+
+random.seed(0)
+group = [SimpleNamespace(fitness=_) for _ in [3.0, 9.0, 1.0, 5.0, 7.0]]
+
+# the truncation keeps the best individuals, from the best one
+assert [_.fitness for _ in truncation(group, 3)] == [9.0, 7.0, 5.0]
+assert len(truncation(group, 10)) == len(group)
+
+# a tournament selects the given number of individuals, from the group
+selected = tournament(2)(group, 8)
+assert len(selected) == 8 and all(_ in group for _ in selected)
+
+# the worst individual never wins a tournament, the best one always does
+assert all(_.fitness > 1.0 for _ in tournament(2)(group, 100))
+assert all(_.fitness == 9.0 for _ in tournament(len(group))(group, 10))
+
+# a (mu,lambda) strategy cannot keep more individuals than the generated ones
+try:
+    comma(4, 2)
+    assert False
+except ValueError:
+    pass
+comma(2, 2)
+
+# the batched evaluation needs the surrogate world, and a task whose worlds
+# are neither prepared for each life nor moved
+for surrogate, continuous, dynamic in [
+    (None, True, False), (object(), False, False), (object(), True, True)
+]:
+    task = SimpleNamespace(
+        continuous=continuous, life_manager=SimpleNamespace(dynamic=dynamic)
+    )
+    try:
+        batch(SimpleNamespace(surrogate=surrogate, goal_task=task), [])
+        assert False
+    except ValueError:
+        pass
+
+# the CMA-ES finds the maximum of a quadratic function, shrinking its steps
+target = np.array([1.0, -2.0, 0.5, 3.0])
+distribution = Distribution(np.zeros(4), 1.0, 8, np.random.default_rng(0))
+assert sample(distribution).shape == (8, 4)
+for _ in range(300):
+    points = sample(distribution)
+    update(distribution, points, -((points - target) ** 2).sum(axis=1))
+assert np.allclose(distribution.mean, target, atol=1e-3)
+assert distribution.sigma < 1e-2
+assert np.allclose(distribution.C, distribution.C.T)
+
+# a distribution restored from its (json) state samples the same points, and
+# adapts the same way (up to the rounding of the matrix products)
+restored = from_state(json.loads(json.dumps(state(distribution))))
+assert np.array_equal(sample(restored), sample(distribution))
+points = sample(distribution)
+update(distribution, points, -((points - target) ** 2).sum(axis=1))
+update(restored, points, -((points - target) ** 2).sum(axis=1))
+assert np.allclose(sample(restored), sample(distribution))
@@ -0,0 +1,60 @@
+import networkx as nx
+import numpy as np
+
+from controllers.runner.robot.circuit import from_graph, stimulate, voltage
+from controllers.runner.robot.circuit import laplacian_matrix, materialize, Mode
+from controllers.runner.robot.circuit import batch, stimulate_batch
+from nanowire_network_simulator.model.device import Datasheet
+
+
+graph = nx.grid_2d_graph(4, 4)
+graph = nx.convert_node_labels_to_integers(graph)
+nx.set_edge_attributes(graph, 0.0, 'g')
+nx.set_edge_attributes(graph, Datasheet().Y_min, 'Y')
+nx.set_node_attributes(graph, 0.0, 'V')
+
+circuit = from_graph(graph)
+inputs, loads = [(0, 10.0), (3, 5.0)], [(15, 1e3)]
+for _ in range(10):
+    stimulate(circuit, Datasheet(), 0.1, inputs, loads, set())
+
+# the sources are forced to their voltage
+assert voltage(circuit, 0) == 10.0
+assert voltage(circuit, 3) == 5.0
+
+# the currents are conserved in all the other nodes (the load leaks to ground)
+currents = laplacian_matrix(circuit, [(15, 1e-3)]) @ circuit.V
+assert np.allclose(np.delete(currents, [0, 3]), 0.0)
+
+# the stimulated junctions become more conductive
+assert circuit.Y.max() > Datasheet().Y_min
+
+# the graph is updated only when materialized
+assert graph.nodes[15]['V'] == 0.0
+materialize(circuit, graph)
+assert graph.nodes[15]['V'] == voltage(circuit, 15)
+assert graph[0][1]['Y'] == circuit.Y[list(graph.edges).index((0, 1))]
+
+# all the solution strategies reach the same state, also when pins change
+circuits = [from_graph(graph.copy(), mode) for mode in Mode]
+for index in range(20):
+    inputs = [(0, 10.0 * (index % 3)), (3, 5.0)]
+    loads = [(15, 1e3)] if index < 10 else [(12, 1e4)]
+    for instance in circuits:
+        stimulate(instance, Datasheet(), 0.1, inputs, loads, {5})
+for instance in circuits[1:]:
+    assert np.allclose(instance.V, circuits[0].V, atol=1e-8)
+    assert np.allclose(instance.Y, circuits[0].Y)
+
+# a batch of circuits evolves as each circuit stimulated alone
+alone = [from_graph(graph.copy()) for _ in range(3)]
+together = [from_graph(graph.copy()) for _ in range(3)]
+group = batch(together, [Datasheet()] * 3)
+for index in range(10):
+    inputs = [[(0, 2.0 * k + index % 2)] for k in range(3)]
+    loads = [[(15, 1e3)], [(14, 1e2)], [(13, 1e4)]]
+    for instance, i, l in zip(alone, inputs, loads):
+        stimulate(instance, Datasheet(), 0.1, i, l, set())
+    stimulate_batch(group, 0.1, inputs, loads)
+for a, b in zip(alone, together):
+    assert np.allclose(a.V, b.V) and np.allclose(a.Y, b.Y)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from controllers.runner.robot.cortex import clone, new, stimulate, synchronize
+from controllers.runner.robot.cortex import to_sparse
+from nanowire_network_simulator.model.device import Datasheet
+
+
+# a generated device, evolved by the simulator and by the sparse circuit
+datasheet = Datasheet(
+    wires_count=100, Lx=36.5, Ly=36.5, mean_length=10.0, seed=1234
+)
+graph = new(datasheet)
+sparse = to_sparse(clone(graph))
+
+nodes = list(graph.network.nodes)
+sources, loaded, grounded = nodes[:3], nodes[-2:], {nodes[3]}
+for step in range(30):
+    inputs = [(_, 10.0 * ((step + i) % 4) / 3) for i, _ in enumerate(sources)]
+    loads = [(_, 10 ** (2 + step % 3)) for _ in loaded]
+    for instance in (graph, sparse):
+        stimulate(instance, 0.032, inputs, loads, grounded)
+
+# the backends reach the same voltages and conductances
+network = synchronize(sparse)
+for node in nodes:
+    assert np.isclose(
+        network.nodes[node]['V'], graph.network.nodes[node]['V'],
+        rtol=1e-6, atol=1e-9
+    )
+for u, v in graph.network.edges:
+    assert np.isclose(
+        network[u][v]['Y'], graph.network[u][v]['Y'], rtol=1e-6, atol=1e-12
+    )
@@ -0,0 +1,39 @@
+from controllers.runner.robot.surrogate import Surrogate
+from controllers.runner.world.arena import load
+from controllers.runner.world.colors import Colors
+
+
+arena = load('worlds/main_world.wbt')
+assert len(arena.obstacles) == 14
+assert arena.translation == (0.08, 0.0, -0.0600003)
+
+body = Surrogate([f'ps{_}' for _ in range(8)] + ['gs0', 'xx0'], arena)
+assert len(body.sensors) == 9
+
+# far from the obstacles, the proximity sensors read the minimum value
+assert all(_.read() < 100 for _ in body.sensors[:8])
+assert Colors.convert(body.sensors[-1].read()) == Colors.GRAY
+
+# going straight, the robot approaches the box in front of it and stops there
+for motor in body.motors:
+    motor.speed = 6.28
+for _ in range(50):
+    body.step(body.run_frequency.ms)
+front, rear = body.sensors[0].read(), body.sensors[4].read()
+assert front > 1000 > 100 > rear
+assert body.getFromDef('evolvable').getContactPoints() == []
+
+# turning on itself, the robot does not move
+position = body.getFromDef('evolvable').getField('translation').getSFVec3f()
+body.motors[0].speed = -6.28
+body.step(body.run_frequency.ms)
+translation = body.getFromDef('evolvable').getField('translation')
+assert translation.getSFVec3f() == position
+
+# the moved obstacles are perceived, the reset restores the world
+body.getFromDef('box_0').getField('translation').setSFVec3f([1, 0, 1])
+body.step(body.run_frequency.ms)
+assert body.sensors[0].read() < 100 or body.sensors[7].read() < 100
+body.simulationReset()
+assert translation.getSFVec3f() == list(arena.translation)
+assert body.getFromDef('box_0').getField('translation').getSFVec3f()[0] < 0
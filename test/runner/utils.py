@@ -1,4 +1,6 @@
-from controllers.runner.utils import adapt
+import numpy as np
+
+from controllers.runner.utils import adapt, mapper
 
 
 assert adapt(0, (0, 10), (0, 5)) == 0
@@ -22,3 +24,10 @@ assert adapt(10, (0, 10), (5, -5)) == -5
 assert adapt(0, (-10, 0), (0, 5)) == 5
 assert adapt(-5, (-10, 0), (0, 5)) == 2.5
 assert adapt(-10, (-10, 0), (0, 5)) == 0
+
+# the mapper behaves as adapt, also on arrays
+assert mapper((0, 10), (5, -5))(5) == adapt(5, (0, 10), (5, -5))
+assert mapper((0, 10), (5, -5)) is mapper((0, 10), (5, -5))
+values = mapper((-10, 0), (0, 5))(np.array([-10, -5, 0, 5]))
+assert values.tolist() == [0, 2.5, 5, 5]
+assert adapt(np.array([0, 5, 10]), (0, 10), (0, -5)).tolist() == [0, -2.5, -5]
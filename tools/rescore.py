@@ -0,0 +1,29 @@
+"""
+Scores again the lives saved in a run folder with a fitness formula, writing
+them as a json dataset for the analysis (see 'analysis/fitness'). The formula is
+the full name of an evaluator class or of a function of the observations, e.g.:
+    PYTHONPATH=controllers/runner python tools/rescore.py res/run/ \
+        optimization.task.avoidance.collision.fitness.Fitness \
+        res/rescored/dataset.json [processes]
+"""
+
+import json
+import sys
+
+from importlib import import_module
+from optimization.fitness import Fitness
+from optimization.rescore import evaluation, rescore
+
+_, folder, formula, output_filename, *processes = sys.argv
+
+print(f'Scoring the lives in {folder} with {formula}')
+
+module, name = formula.rsplit('.', 1)
+formula = getattr(import_module(module), name)
+if isinstance(formula, type) and issubclass(formula, Fitness):
+    formula = evaluation(formula)
+
+json_objects = rescore(folder, formula, *map(int, processes))
+
+with open(output_filename, mode='w') as file:
+    json.dump(json_objects, file, indent=4)